@@ -0,0 +1,466 @@
+import argparse
+import ipaddress
+import multiprocessing
+import os
+import queue
+import secrets
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+from helicopter_reward import REWARD_MODES
+
+
+def parse_address(address):
+    """'host:port' for TCP, 'unix:/path/to/socket' for a Unix socket."""
+    if address.startswith("unix:"):
+        return address[len("unix:") :]
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def is_local_address(address):
+    """Whether only this host can connect to `address` (as from parse_address)."""
+    if isinstance(address, str):
+        return True  # Unix socket
+    host = address[0]
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _policy_state(policy):
+    return {name: v.cpu().numpy() for name, v in policy.state_dict().items()}
+
+
+def _load_policy_state(policy, state):
+    import torch
+
+    policy.load_state_dict({name: torch.as_tensor(v) for name, v in state.items()})
+
+
+def run_actor(address, authkey, reward_mode="survival", seed=None):
+    """
+    Step helicopter envs with the latest policy received from the learner and
+    stream rollouts back to it. The number of envs and the rollout length are
+    set by the learner.
+    """
+    import torch
+    from helicopter_env import HelicopterEnv
+    from stable_baselines3.common.env_util import make_vec_env
+    from stable_baselines3.common.policies import ActorCriticPolicy
+    from stable_baselines3.common.utils import obs_as_tensor
+
+    torch.set_num_threads(1)
+    conn = Client(address, authkey=authkey.encode())
+    kind, config = conn.recv()
+    assert kind == "config", kind
+    n_envs = config["n_envs"]
+    n_steps = config["n_steps"]
+    gamma = config["gamma"]
+
+    vec_env = make_vec_env(
+        HelicopterEnv,
+        n_envs=n_envs,
+        seed=seed,
+        env_kwargs={"render_mode": None, "reward_mode": reward_mode},
+    )
+    policy = ActorCriticPolicy(
+        vec_env.observation_space,
+        vec_env.action_space,
+        lambda _: 0.0,
+        **config["policy_kwargs"],
+    )
+    policy.set_training_mode(False)
+    version = None
+
+    obs = vec_env.reset()
+    episode_starts = np.ones(n_envs, dtype=bool)
+    episode_returns = np.zeros(n_envs)
+    episode_lengths = np.zeros(n_envs, dtype=np.int64)
+    obs_shape = vec_env.observation_space.shape
+    try:
+        while True:
+            # Always collect with the newest policy the learner has sent
+            while version is None or conn.poll():
+                message = conn.recv()
+                if message[0] == "stop":
+                    return
+                _, version, state = message
+                _load_policy_state(policy, state)
+
+            batch = {
+                "observations": np.zeros((n_steps, n_envs, *obs_shape), np.float32),
+                "actions": np.zeros((n_steps, n_envs, 1), np.float32),
+                "rewards": np.zeros((n_steps, n_envs), np.float32),
+                "episode_starts": np.zeros((n_steps, n_envs), np.float32),
+                "values": np.zeros((n_steps, n_envs), np.float32),
+                "log_probs": np.zeros((n_steps, n_envs), np.float32),
+            }
+            episodes = []
+            start = time.perf_counter()
+            for step in range(n_steps):
+                with torch.no_grad():
+                    actions, values, log_probs = policy(obs_as_tensor(obs, "cpu"))
+                actions = actions.numpy()
+                new_obs, rewards, dones, infos = vec_env.step(actions)
+
+                episode_returns += rewards
+                episode_lengths += 1
+                for i in np.flatnonzero(dones):
+                    episodes.append(
+                        (float(episode_returns[i]), int(episode_lengths[i]))
+                    )
+                    episode_returns[i] = 0.0
+                    episode_lengths[i] = 0
+                    # Bootstrap episodes cut by a time limit, as SB3 does
+                    if infos[i].get("TimeLimit.truncated", False):
+                        terminal_obs = policy.obs_to_tensor(
+                            infos[i]["terminal_observation"]
+                        )[0]
+                        with torch.no_grad():
+                            terminal_value = policy.predict_values(terminal_obs)
+                        rewards[i] += gamma * terminal_value.item()
+
+                batch["observations"][step] = obs
+                batch["actions"][step] = actions.reshape(n_envs, 1)
+                batch["rewards"][step] = rewards
+                batch["episode_starts"][step] = episode_starts
+                batch["values"][step] = values.flatten().numpy()
+                batch["log_probs"][step] = log_probs.numpy()
+                obs = new_obs
+                episode_starts = dones
+
+            with torch.no_grad():
+                last_values = policy.predict_values(obs_as_tensor(obs, "cpu"))
+            batch["last_values"] = last_values.flatten().numpy()
+            batch["dones"] = episode_starts.astype(np.float32)
+            batch["episodes"] = episodes
+            batch["rollout_time"] = time.perf_counter() - start
+            conn.send(("rollout", version, batch))
+    except (EOFError, ConnectionError):
+        # The learner went away
+        pass
+    finally:
+        vec_env.close()
+        conn.close()
+
+
+class Learner:
+    """
+    Train PPO on rollouts streamed by actor processes.
+
+    Actors connect over a TCP or Unix socket at any time. Each update stacks
+    `rollouts_per_update` rollouts, trains on them and broadcasts the new
+    policy weights; actors pick them up between rollouts. Rollouts collected
+    with a policy more than `max_policy_lag` versions old are dropped.
+    """
+
+    def __init__(
+        self,
+        address,
+        authkey,
+        n_envs_per_actor=8,
+        rollouts_per_update=4,
+        max_policy_lag=1,
+        log_dir="tmp/",
+        save_freq=100,
+        **hyperparams,
+    ):
+        from helicopter_env import HelicopterEnv
+        from stable_baselines3.common.buffers import RolloutBuffer
+        from stable_baselines3.common.logger import configure
+        from stable_baselines3.common.vec_env import DummyVecEnv
+        from train import make_model
+
+        self.n_envs_per_actor = n_envs_per_actor
+        self.rollouts_per_update = rollouts_per_update
+        self.max_policy_lag = max_policy_lag
+        self.log_dir = log_dir
+        self.save_freq = save_freq
+
+        # The env only provides the spaces; the learner never steps it
+        env = DummyVecEnv([lambda: HelicopterEnv(render_mode=None)])
+        self.model = make_model(env, log_dir, **hyperparams)
+        self.model.set_logger(
+            configure(
+                os.path.join(log_dir, "tensorboard", "actor_learner"),
+                ["stdout", "tensorboard"],
+            )
+        )
+        self.model.rollout_buffer = RolloutBuffer(
+            self.model.n_steps,
+            env.observation_space,
+            env.action_space,
+            device=self.model.device,
+            gamma=self.model.gamma,
+            gae_lambda=self.model.gae_lambda,
+            n_envs=n_envs_per_actor * rollouts_per_update,
+        )
+        self.config = {
+            "n_envs": n_envs_per_actor,
+            "n_steps": self.model.n_steps,
+            "gamma": self.model.gamma,
+            "policy_kwargs": self.model.policy_kwargs,
+        }
+
+        self.version = 0
+        self.__state = _policy_state(self.model.policy)
+        self.__rollouts = queue.Queue()
+        self.__connections = []
+        self.__lock = threading.Lock()
+        self.__listener = Listener(address, authkey=authkey.encode())
+        self.address = self.__listener.address
+        threading.Thread(target=self.__accept, daemon=True).start()
+
+    def __accept(self):
+        while True:
+            try:
+                conn = self.__listener.accept()
+            except OSError:
+                return  # Listener closed
+            try:
+                conn.send(("config", self.config))
+                with self.__lock:
+                    conn.send(("policy", self.version, self.__state))
+                    self.__connections.append(conn)
+            except OSError:
+                continue
+            threading.Thread(target=self.__receive, args=(conn,), daemon=True).start()
+
+    def __receive(self, conn):
+        try:
+            while True:
+                self.__rollouts.put(conn.recv())
+        except (EOFError, OSError):
+            with self.__lock:
+                if conn in self.__connections:
+                    self.__connections.remove(conn)
+
+    def __broadcast(self, message):
+        with self.__lock:
+            for conn in list(self.__connections):
+                try:
+                    conn.send(message)
+                except OSError:
+                    self.__connections.remove(conn)
+
+    def __next_rollouts(self):
+        """Block until enough fresh rollouts are available; count stale ones."""
+        rollouts = []
+        dropped = 0
+        while len(rollouts) < self.rollouts_per_update:
+            _, version, batch = self.__rollouts.get()
+            if self.version - version > self.max_policy_lag:
+                dropped += 1
+            else:
+                rollouts.append((version, batch))
+        return rollouts, dropped
+
+    def learn(self, total_timesteps):
+        import torch
+        from stable_baselines3.common.utils import safe_mean
+
+        model = self.model
+        buffer = model.rollout_buffer
+        episodes = []
+        start = time.perf_counter()
+        while model.num_timesteps < total_timesteps:
+            wait_start = time.perf_counter()
+            rollouts, dropped = self.__next_rollouts()
+            wait_time = time.perf_counter() - wait_start
+
+            buffer.reset()
+            for name in (
+                "observations",
+                "actions",
+                "rewards",
+                "episode_starts",
+                "values",
+                "log_probs",
+            ):
+                getattr(buffer, name)[:] = np.concatenate(
+                    [batch[name] for _, batch in rollouts], axis=1
+                ).reshape(getattr(buffer, name).shape)
+            buffer.pos = buffer.buffer_size
+            buffer.full = True
+            buffer.compute_returns_and_advantage(
+                torch.as_tensor(
+                    np.concatenate([batch["last_values"] for _, batch in rollouts])
+                ),
+                np.concatenate([batch["dones"] for _, batch in rollouts]),
+            )
+            for _, batch in rollouts:
+                episodes.extend(batch["episodes"])
+            episodes = episodes[-100:]
+
+            model.num_timesteps += buffer.buffer_size * buffer.n_envs
+            model._current_progress_remaining = max(
+                0.0, 1.0 - model.num_timesteps / total_timesteps
+            )
+            update_start = time.perf_counter()
+            model.train()
+            update_time = time.perf_counter() - update_start
+
+            self.version += 1
+            state = _policy_state(model.policy)
+            with self.__lock:
+                self.__state = state
+            self.__broadcast(("policy", self.version, state))
+
+            elapsed = time.perf_counter() - start
+            model.logger.record("time/fps", int(model.num_timesteps / elapsed))
+            model.logger.record("time/total_timesteps", model.num_timesteps)
+            model.logger.record("time/learner_wait", wait_time)
+            model.logger.record("time/learner_update", update_time)
+            model.logger.record("learner/policy_version", self.version)
+            model.logger.record(
+                "learner/policy_lag",
+                safe_mean([self.version - 1 - v for v, _ in rollouts]),
+            )
+            model.logger.record("learner/dropped_rollouts", dropped)
+            with self.__lock:
+                model.logger.record("learner/actors", len(self.__connections))
+            if episodes:
+                returns, lengths = zip(*episodes)
+                model.logger.record("rollout/ep_rew_mean", safe_mean(returns))
+                model.logger.record("rollout/ep_len_mean", safe_mean(lengths))
+            model.logger.dump(model.num_timesteps)
+
+            if self.save_freq and self.version % self.save_freq == 0:
+                name = f"rl_model_{model.num_timesteps}_steps"
+                model.save(os.path.join(self.log_dir, name))
+        return model
+
+    def close(self):
+        self.__broadcast(("stop",))
+        self.__listener.close()
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="role", required=True)
+
+    learner = subparsers.add_parser("learner", help="Run the PPO learner")
+    learner.add_argument(
+        "--listen",
+        type=str,
+        default="localhost:6000",
+        help="'host:port' or 'unix:/path/to/socket'",
+    )
+    learner.add_argument(
+        "--local-actors",
+        type=int,
+        default=4,
+        help="Actor processes to start on this host",
+    )
+    learner.add_argument("--n-envs", type=int, default=8, help="Envs per actor")
+    learner.add_argument(
+        "--rollouts-per-update",
+        type=int,
+        default=4,
+        help="Actor rollouts stacked into each PPO update",
+    )
+    learner.add_argument(
+        "--max-policy-lag",
+        type=int,
+        default=1,
+        help="Drop rollouts collected with a policy this many versions old",
+    )
+    learner.add_argument("--n-steps", type=int, default=512, help="Steps per rollout")
+    learner.add_argument("--total-timesteps", type=int, default=100_000_000)
+    learner.add_argument(
+        "--save-freq",
+        type=int,
+        default=100,
+        help="Updates between checkpoints",
+    )
+    learner.add_argument(
+        "--reward-mode",
+        type=str,
+        default="survival",
+        choices=sorted(REWARD_MODES),
+        help="Reward mode of the local actors",
+    )
+
+    actor = subparsers.add_parser("actor", help="Run an actor for a remote learner")
+    actor.add_argument(
+        "--connect",
+        type=str,
+        required=True,
+        help="Learner address, 'host:port' or 'unix:/path/to/socket'",
+    )
+    actor.add_argument(
+        "--reward-mode", type=str, default="survival", choices=sorted(REWARD_MODES)
+    )
+    actor.add_argument("--seed", type=int)
+
+    for subparser in (learner, actor):
+        subparser.add_argument(
+            "--authkey",
+            type=str,
+            default=os.environ.get("HELICOPTER_AUTHKEY"),
+            help="Shared secret (default: $HELICOPTER_AUTHKEY)",
+        )
+    args = parser.parse_args()
+
+    # Connections exchange pickles, so anyone holding the key can run code on
+    # the other side
+    if not args.authkey:
+        if args.role == "actor":
+            parser.error("actors need --authkey or $HELICOPTER_AUTHKEY")
+        if not is_local_address(parse_address(args.listen)):
+            parser.error(
+                f"--listen {args.listen} accepts remote connections; "
+                "set --authkey or $HELICOPTER_AUTHKEY"
+            )
+        args.authkey = secrets.token_hex(16)
+        print(f"Generated authkey {args.authkey}")
+
+    if args.role == "actor":
+        run_actor(
+            parse_address(args.connect),
+            args.authkey,
+            reward_mode=args.reward_mode,
+            seed=args.seed,
+        )
+        return
+
+    learner = Learner(
+        parse_address(args.listen),
+        args.authkey,
+        n_envs_per_actor=args.n_envs,
+        rollouts_per_update=args.rollouts_per_update,
+        max_policy_lag=args.max_policy_lag,
+        save_freq=args.save_freq,
+        n_steps=args.n_steps,
+    )
+    ctx = multiprocessing.get_context("spawn")
+    actors = [
+        ctx.Process(
+            target=run_actor,
+            args=(learner.address, args.authkey),
+            kwargs={
+                "reward_mode": args.reward_mode,
+                "seed": i * args.n_envs,
+            },
+            daemon=True,
+        )
+        for i in range(args.local_actors)
+    ]
+    for process in actors:
+        process.start()
+    try:
+        learner.learn(args.total_timesteps)
+    finally:
+        learner.close()
+        for process in actors:
+            process.join(timeout=10)
+
+
+if __name__ == "__main__":
+    _main()
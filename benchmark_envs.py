@@ -2,7 +2,6 @@ import argparse
 import time
 
 from helicopter_env import HelicopterEnv
-from stable_baselines3.common.env_util import make_vec_env
 
 
 def benchmark_once(n_envs: int, steps_per_env: int, render_mode: str | None = None):
@@ -10,6 +9,8 @@ def benchmark_once(n_envs: int, steps_per_env: int, render_mode: str | None = No
     对给定 n_envs 跑 steps_per_env 步，统计 fps。
     总步数 = n_envs * steps_per_env
     """
+    from stable_baselines3.common.env_util import make_vec_env
+
     print(f"\n=== Benchmark: n_envs = {n_envs}, steps_per_env = {steps_per_env} ===")
 
     # 不需要渲染，纯算速度，所以 render_mode=None
@@ -42,6 +43,30 @@ def benchmark_once(n_envs: int, steps_per_env: int, render_mode: str | None = No
     return fps
 
 
+def benchmark_shared_course(n_envs: int, steps_per_env: int):
+    """All n_envs helicopters fly one shared tunnel (SharedCourseVecEnv)."""
+    from shared_course import SharedCourseVecEnv
+
+    print(
+        f"\n=== Shared course: n_envs = {n_envs}, "
+        f"steps_per_env = {steps_per_env} ==="
+    )
+    vec_env = SharedCourseVecEnv(n_envs)
+    vec_env.reset()
+    total_steps = n_envs * steps_per_env
+
+    start_time = time.time()
+    for _ in range(steps_per_env):
+        actions = [vec_env.action_space.sample() for _ in range(n_envs)]
+        vec_env.step(actions)
+    elapsed = time.time() - start_time
+
+    fps = total_steps / elapsed
+    print(f"→ FPS (environment steps / second): {fps:.1f}")
+    vec_env.close()
+    return fps
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -56,6 +81,11 @@ def main():
         default=2000,
         help="Number of steps to run per env for each benchmark point",
     )
+    parser.add_argument(
+        "--shared-course",
+        action="store_true",
+        help="Benchmark SharedCourseVecEnv (one tunnel shared by all envs)",
+    )
     args = parser.parse_args()
 
     n_envs_list = [int(x) for x in args.n_envs_list.split(",")]
@@ -66,7 +96,10 @@ def main():
 
     results = {}
     for n_envs in n_envs_list:
-        fps = benchmark_once(n_envs, args.steps_per_env, render_mode=None)
+        if args.shared_course:
+            fps = benchmark_shared_course(n_envs, args.steps_per_env)
+        else:
+            fps = benchmark_once(n_envs, args.steps_per_env, render_mode=None)
         results[n_envs] = fps
 
     print("\n=== Summary ===")
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Run in a fresh interpreter: import everything first, so the baseline RSS
+# holds the libraries, then build the envs, step them and measure again.
+_PROBE = """
+import gc, json, os
+import numpy as np
+from game_batch import GameBatchVecEnv
+from helicopter_env import HelicopterEnv
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+gc.collect()
+baseline = rss()
+if {kind!r} == "batch":
+    vec_env = GameBatchVecEnv({n_envs})
+else:
+    vec_env = DummyVecEnv(
+        [lambda: HelicopterEnv(render_mode="rgb_array") for _ in range({n_envs})]
+    )
+vec_env.reset()
+rng = np.random.default_rng(0)
+for _ in range({steps}):
+    vec_env.step(rng.integers(2, size={n_envs}))
+gc.collect()
+print(json.dumps({{"baseline": baseline, "rss": rss()}}))
+"""
+
+
+def measure(kind, n_envs, steps):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _PROBE.format(kind=kind, n_envs=n_envs, steps=steps),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--n-envs-list",
+        type=str,
+        default="1,100,1000,10000",
+        help="Comma-separated list of env counts",
+    )
+    parser.add_argument(
+        "--kinds",
+        type=str,
+        default="env,batch",
+        help="'env' (DummyVecEnv of HelicopterEnv) and/or 'batch' (GameBatchVecEnv)",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=200,
+        help="Steps taken before measuring, so episodes end and restart",
+    )
+    args = parser.parse_args()
+
+    print(f"{'kind':<6} {'n_envs':>8} {'bytes/env':>10} {'envs MB':>9} {'RSS MB':>8}")
+    for kind in args.kinds.split(","):
+        for n_envs in [int(n) for n in args.n_envs_list.split(",")]:
+            result = measure(kind, n_envs, args.steps)
+            envs = result["rss"] - result["baseline"]
+            print(
+                f"{kind:<6} {n_envs:>8} {envs / n_envs:>10.0f} "
+                f"{envs / 1e6:>9.1f} {result['rss'] / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ENTRY_POINTS = ["train", "eval", "eval_policy", "record_video", "benchmark_envs"]
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The first step of each entry point, taken the way the entry point takes it:
+# train builds its envs and a new model, the evaluation scripts load a saved
+# model, and every one of them steps once with the policy's action.
+FIRST_STEPS = {
+    "train": """
+vec_env = train.make_env(1, {work_dir!r})
+model = train.make_model(vec_env, {work_dir!r}, verbose=0)
+action, _ = model.predict(vec_env.reset())
+vec_env.step(action)
+""",
+    "eval": """
+from stable_baselines3 import PPO
+env = eval.HelicopterEnv(render_mode=None)
+model = PPO.load({model_path!r}, env=env)
+obs, _ = env.reset()
+action, _ = model.predict(obs)
+env.step(action)
+""",
+    "eval_policy": """
+from stable_baselines3 import PPO
+from stable_baselines3.common.monitor import Monitor
+env = Monitor(eval_policy.HelicopterEnv(render_mode=None))
+model = PPO.load({model_path!r})
+obs, _ = env.reset()
+action, _ = model.predict(obs, deterministic=True)
+env.step(action)
+""",
+    "record_video": """
+from stable_baselines3 import PPO
+model = PPO.load({model_path!r})
+env = record_video.HelicopterEnv(render_mode="rgb_array")
+obs, _ = env.reset()
+action, _ = model.predict(obs, deterministic=True)
+env.step(action)
+env.render()
+""",
+    "benchmark_envs": """
+from stable_baselines3.common.env_util import make_vec_env
+vec_env = make_vec_env(benchmark_envs.HelicopterEnv, n_envs=1)
+vec_env.reset()
+vec_env.step([vec_env.action_space.sample()])
+""",
+}
+
+# Run in a fresh interpreter: import the entry point, then take its first step
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{first_step}
+stepped = time.perf_counter()
+print(json.dumps({{"import": imported - start, "first_step": stepped - start}}))
+"""
+
+# Save a small untrained model for the entry points that load one
+_SAVE_MODEL = """
+import train
+model = train.make_model(train.make_env(1, {work_dir!r}), {work_dir!r}, verbose=0)
+model.save({model_path!r})
+"""
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=REPO_DIR,
+    ).stdout
+
+
+def measure(module, work_dir, model_path):
+    first_step = FIRST_STEPS[module].format(work_dir=work_dir, model_path=model_path)
+    start = time.perf_counter()
+    output = _run(_PROBE.format(module=module, first_step=first_step))
+    total = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    result["total"] = total
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--entry-points",
+        type=str,
+        default=",".join(ENTRY_POINTS),
+        help="Comma-separated list of entry point modules to benchmark",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=5,
+        help="Number of runs per entry point; the fastest is reported",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    interpreter = (time.perf_counter() - start) / args.repeats
+    print(f"Bare interpreter startup: {interpreter * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = os.path.join(work_dir, "model.zip")
+        _run(_SAVE_MODEL.format(work_dir=work_dir, model_path=model_path))
+
+        print(f"{'entry point':<16} {'import':>10} {'first step':>12} {'process':>10}")
+        for module in args.entry_points.split(","):
+            runs = [measure(module, work_dir, model_path) for _ in range(args.repeats)]
+            best = min(runs, key=lambda r: r["first_step"])
+            print(
+                f"{module:<16} {best['import'] * 1000:>8.0f}ms "
+                f"{best['first_step'] * 1000:>10.0f}ms {best['total'] * 1000:>8.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import math
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+def read_episode_rewards(log_dir):
+    """Read the episode rewards written by BufferedVecMonitor to `log_dir`."""
+    from episode_monitor import load_episodes
+
+    return load_episodes(log_dir)["r"].tolist()
+
+
+class RewardTermsCallback(BaseCallback):
+    """Log the mean of every reward term reported by the envs."""
+
+    def _on_step(self) -> bool:
+        # Batched envs report the mean of each term over all envs instead
+        term_means = getattr(self.training_env, "reward_term_means", None)
+        if term_means is not None:
+            for name, value in term_means.items():
+                self.logger.record_mean(f"reward/{name}", value)
+            return True
+        for info in self.locals["infos"]:
+            for name, value in info.get("reward_terms", {}).items():
+                self.logger.record_mean(f"reward/{name}", value)
+        return True
+
+
+class EarlyStoppingCallback(BaseCallback):
+    """
+    Stop a sweep trial from its episode-reward curve in the episode monitor log.
+
+    Every `eval_freq` timesteps the mean reward of the last `window` episodes
+    is reported to the sweep store. The trial stops when it is below the
+    median of the other trials at the same step (median stopping rule), or
+    when it has not improved for `patience` reports.
+    """
+
+    def __init__(
+        self,
+        store,
+        trial_id,
+        log_dir,
+        eval_freq,
+        window=100,
+        warmup=0,
+        min_trials=4,
+        patience=5,
+    ):
+        super().__init__()
+        self.store = store
+        self.trial_id = trial_id
+        self.log_dir = log_dir
+        self.eval_freq = eval_freq
+        self.window = window
+        self.warmup = warmup
+        self.min_trials = min_trials
+        self.patience = patience
+
+        self.best_reward = -math.inf
+        self.last_reward = None
+        self.stale_reports = 0
+        self.pruned = False
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps % self.eval_freq >= self.training_env.num_envs:
+            return True
+        # Write out the episodes the monitor is still buffering
+        self.training_env.flush()
+        rewards = read_episode_rewards(self.log_dir)
+        if not rewards:
+            return True
+
+        step = self.num_timesteps // self.eval_freq * self.eval_freq
+        recent = rewards[-self.window :]
+        reward = sum(recent) / len(recent)
+        self.last_reward = reward
+        self.store.report(self.trial_id, step, reward)
+
+        if reward > self.best_reward:
+            self.best_reward = reward
+            self.stale_reports = 0
+        else:
+            self.stale_reports += 1
+
+        if step < self.warmup:
+            return True
+        others = self.store.rewards_at(step, self.trial_id)
+        if len(others) >= self.min_trials:
+            others.sort()
+            median = others[len(others) // 2]
+            if reward < median:
+                self.pruned = True
+                return False
+        if self.stale_reports >= self.patience:
+            self.pruned = True
+            return False
+        return True
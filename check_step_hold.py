@@ -0,0 +1,75 @@
+import argparse
+import random
+import sys
+
+import numpy as np
+from helicopter_env import HelicopterEnv
+from helicopter_reward import REWARD_MODES
+
+HOLD_LENGTHS = [1, 2, 3, 5, 8, 13, 40, 200]
+
+
+def check_episode(seed, reward_mode, reset_speed_on_thrust):
+    """
+    Fly one course with step_hold on one env and the same actions frame by
+    frame with step on another; return the holds and the mismatching holds.
+    """
+    hold_env = HelicopterEnv(render_mode=None, reward_mode=reward_mode)
+    step_env = HelicopterEnv(render_mode=None, reward_mode=reward_mode)
+    for env in (hold_env, step_env):
+        env.game.RESET_SPEED_ON_THRUST = reset_speed_on_thrust
+        env.reset(seed=seed)
+    rng = random.Random(seed)
+    holds = mismatches = 0
+    while not step_env.game.game_over:
+        # Steer roughly towards the centerline, so episodes last a while
+        game = step_env.game
+        target = game.get_center_y() + rng.uniform(-15, 15)
+        action = int(game.helicopter_pos_y + 6 * game.helicopter_speed_y > target)
+        max_frames = rng.choice(HOLD_LENGTHS)
+
+        obs, reward, terminated, _, info = hold_env.step_hold(action, max_frames)
+        frames = 0
+        step_reward = 0.0
+        step_terms = dict.fromkeys(info["reward_terms"], 0.0)
+        while frames < max_frames:
+            step_obs, r, step_terminated, _, step_info = step_env.step(action)
+            step_reward += r
+            for name, value in step_info["reward_terms"].items():
+                step_terms[name] += value
+            frames += 1
+            if step_terminated:
+                break
+
+        holds += 1
+        mismatches += not (
+            info["frames"] == frames
+            and np.array_equal(obs, step_obs)
+            and reward == step_reward
+            and info["reward_terms"] == step_terms
+            and terminated == step_terminated
+            and repr(hold_env.game.get_state()) == repr(step_env.game.get_state())
+        )
+    return holds, mismatches
+
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description="Check that step_hold equals stepping frame by frame"
+    )
+    parser.add_argument("--n-seeds", type=int, default=100)
+    args = parser.parse_args()
+
+    total_holds = total_mismatches = 0
+    for reset_speed_on_thrust in (True, False):
+        for seed in range(args.n_seeds):
+            reward_mode = sorted(REWARD_MODES)[seed % len(REWARD_MODES)]
+            holds, mismatches = check_episode(seed, reward_mode, reset_speed_on_thrust)
+            total_holds += holds
+            total_mismatches += mismatches
+    print(f"{total_holds} holds, {total_mismatches} mismatches")
+    sys.exit(1 if total_mismatches else 0)
+
+
+if __name__ == "__main__":
+    _main()
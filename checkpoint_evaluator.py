@@ -0,0 +1,284 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import time
+
+import numpy as np
+from helicopter_reward import REWARD_MODES
+
+CHECKPOINT_PATTERN = re.compile(r"rl_model_(\d+)_steps\.zip$")
+
+
+def find_checkpoints(checkpoint_dir, settle_time=2.0):
+    """Return (steps, path) of finished checkpoints, oldest first."""
+    checkpoints = []
+    now = time.time()
+    for entry in os.scandir(checkpoint_dir):
+        match = CHECKPOINT_PATTERN.match(entry.name)
+        # Skip files that may still be being written
+        if match and now - entry.stat().st_mtime >= settle_time:
+            checkpoints.append((int(match.group(1)), entry.path))
+    return sorted(checkpoints)
+
+
+def _init_worker(niceness):
+    import torch
+
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+    torch.set_num_threads(1)
+
+
+def evaluate_seeds(
+    model_path, seeds, max_frames, course_bank=None, reward_mode="survival"
+):
+    """
+    Fly a checkpoint through the given courses, all at once so the policy runs
+    one batched forward pass per frame. Returns distance and reward per seed,
+    with rewards of `reward_mode`, so they compare with training's.
+    With a `course_bank` path, the seeds are course indices into the bank.
+    """
+    from helicopter_env import HelicopterEnv
+    from stable_baselines3 import PPO
+
+    model = PPO.load(model_path, device="cpu")
+    envs = [
+        HelicopterEnv(
+            render_mode=None, reward_mode=reward_mode, course_bank=course_bank
+        )
+        for _ in seeds
+    ]
+    if course_bank is None:
+        obs = [env.reset(seed=seed)[0] for env, seed in zip(envs, seeds)]
+    else:
+        obs = [env.reset(options={"course": seed})[0] for env, seed in zip(envs, seeds)]
+    obs = np.stack(obs)
+    rewards = np.zeros(len(envs))
+    done = np.zeros(len(envs), dtype=bool)
+    for _ in range(max_frames):
+        actions, _ = model.predict(obs, deterministic=True)
+        for i in np.flatnonzero(~done):
+            obs[i], reward, terminated, truncated, _ = envs[i].step(int(actions[i]))
+            rewards[i] += reward
+            done[i] = terminated or truncated
+        if done.all():
+            break
+    distances = [env.game.distance for env in envs]
+    return distances, rewards.tolist(), done.tolist()
+
+
+class CheckpointEvaluator:
+    """
+    Watch a checkpoint directory and evaluate new checkpoints on a fixed bank
+    of seeded courses with a bounded pool of low-priority workers.
+
+    Only the newest checkpoint is evaluated; checkpoints written while an
+    evaluation runs are skipped except the latest. Results go to TensorBoard
+    under eval/, to evaluations.jsonl and, for the best checkpoint so far, to
+    best_model.json in the checkpoint directory.
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir,
+        seeds,
+        workers=2,
+        niceness=10,
+        max_frames=10_000,
+        log_dir=None,
+        course_bank=None,
+        reward_mode="survival",
+    ):
+        from stable_baselines3.common.logger import configure
+
+        self.checkpoint_dir = checkpoint_dir
+        self.seeds = list(seeds)
+        self.course_bank = course_bank
+        self.reward_mode = reward_mode
+        self.workers = workers
+        self.max_frames = max_frames
+        self.last_steps = -1
+        self.best = None
+
+        best_path = os.path.join(checkpoint_dir, "best_model.json")
+        if os.path.exists(best_path):
+            with open(best_path) as f:
+                self.best = json.load(f)
+
+        log_dir = log_dir or os.path.join(checkpoint_dir, "tensorboard", "eval")
+        self.logger = configure(log_dir, ["tensorboard"])
+        self.pool = multiprocessing.get_context("spawn").Pool(
+            workers, initializer=_init_worker, initargs=(niceness,)
+        )
+
+    def evaluate(self, steps, path):
+        chunks = [c for c in np.array_split(self.seeds, self.workers) if len(c)]
+        pending = [
+            self.pool.apply_async(
+                evaluate_seeds,
+                (
+                    path,
+                    [int(seed) for seed in chunk],
+                    self.max_frames,
+                    self.course_bank,
+                    self.reward_mode,
+                ),
+            )
+            for chunk in chunks
+        ]
+        distances, rewards, crashed = [], [], []
+        for result in pending:
+            chunk_distances, chunk_rewards, chunk_crashed = result.get()
+            distances += chunk_distances
+            rewards += chunk_rewards
+            crashed += chunk_crashed
+
+        result = {
+            "path": path,
+            "steps": steps,
+            "mean_distance": float(np.mean(distances)),
+            "median_distance": float(np.median(distances)),
+            "min_distance": float(np.min(distances)),
+            "mean_reward": float(np.mean(rewards)),
+            "crash_rate": float(np.mean(crashed)),
+            "time": time.time(),
+        }
+        for key in (
+            "mean_distance",
+            "median_distance",
+            "min_distance",
+            "mean_reward",
+            "crash_rate",
+        ):
+            self.logger.record(f"eval/{key}", result[key])
+        self.logger.dump(steps)
+
+        with open(os.path.join(self.checkpoint_dir, "evaluations.jsonl"), "a") as f:
+            f.write(json.dumps(result) + "\n")
+        if self.best is None or result["mean_distance"] > self.best["mean_distance"]:
+            self.best = result
+            best_path = os.path.join(self.checkpoint_dir, "best_model.json")
+            with open(best_path + ".tmp", "w") as f:
+                json.dump(result, f, indent=4)
+            os.replace(best_path + ".tmp", best_path)
+        return result
+
+    def poll(self):
+        """Evaluate the newest unevaluated checkpoint, if any."""
+        checkpoints = find_checkpoints(self.checkpoint_dir)
+        if not checkpoints or checkpoints[-1][0] <= self.last_steps:
+            return None
+        steps, path = checkpoints[-1]
+        skipped = sum(1 for s, _ in checkpoints if self.last_steps < s < steps)
+        self.last_steps = steps
+        result = self.evaluate(steps, path)
+        result["skipped"] = skipped
+        return result
+
+    def run(self, poll_interval=10.0):
+        while True:
+            result = self.poll()
+            if result:
+                print(
+                    f"Checkpoint {result['steps']}: mean distance "
+                    f"{result['mean_distance']:.0f}, crash rate "
+                    f"{result['crash_rate']:.2f} ({result['skipped']} skipped)",
+                    flush=True,
+                )
+            else:
+                time.sleep(poll_interval)
+
+    def close(self):
+        # Do not wait for a running evaluation; its result is not needed
+        self.pool.terminate()
+        self.pool.join()
+        self.logger.close()
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkpoint-dir", type=str, default="tmp/")
+    parser.add_argument(
+        "--n-seeds",
+        type=int,
+        default=32,
+        help="Number of courses in the evaluation bank",
+    )
+    parser.add_argument(
+        "--first-seed",
+        type=int,
+        default=1_000_000,
+        help="Course seed of the first course in the bank",
+    )
+    parser.add_argument(
+        "--course-bank",
+        type=str,
+        help="Evaluate on the first n-seeds courses of this bank instead",
+    )
+    parser.add_argument(
+        "--reward-mode",
+        type=str,
+        default="survival",
+        choices=sorted(REWARD_MODES),
+        help="Reward mode of eval/mean_reward; use the one of the training run",
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--nice",
+        type=int,
+        default=10,
+        help="Niceness added to the evaluation workers",
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=10_000,
+        help="Frames after which an episode counts as survived",
+    )
+    parser.add_argument("--poll-interval", type=float, default=10.0)
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Evaluate the newest checkpoint and exit",
+    )
+    args = parser.parse_args()
+
+    # Shut the worker pool down when the training process stops us
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    seeds = range(args.first_seed, args.first_seed + args.n_seeds)
+    if args.course_bank:
+        from course_bank import CourseBank
+
+        n_courses = len(CourseBank(args.course_bank))
+        if args.n_seeds > n_courses:
+            parser.error(
+                f"--n-seeds {args.n_seeds} exceeds the {n_courses} courses "
+                f"of {args.course_bank}"
+            )
+        seeds = range(args.n_seeds)
+    evaluator = CheckpointEvaluator(
+        args.checkpoint_dir,
+        seeds,
+        workers=args.workers,
+        niceness=args.nice,
+        max_frames=args.max_frames,
+        course_bank=args.course_bank,
+        reward_mode=args.reward_mode,
+    )
+    try:
+        if args.once:
+            print(evaluator.poll())
+        else:
+            evaluator.run(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        evaluator.close()
+
+
+if __name__ == "__main__":
+    _main()
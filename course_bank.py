@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from helicopter_game import HelicopterGame, generate_segment
+
+MAGIC = b"HELIBANK"
+VERSION = 1
+# Constants that determine the generated segments
+COURSE_CONSTANTS = (
+    "TUNNEL_SEGMENT_MIN",
+    "TUNNEL_SEGMENT_MAX",
+    "TUNNEL_CENTER_OFFSET_MAX",
+)
+# Data starts at a multiple of this, so the arrays are aligned
+ALIGNMENT = 64
+
+
+def _course_constants(config):
+    return {name: getattr(config, name) for name in COURSE_CONSTANTS}
+
+
+class CourseBank:
+    """
+    Read-only, memory-mapped bank of pre-generated courses.
+
+    Course i is the course of seed `seeds[i]`; `segments[i]` holds the
+    (dx, offset) of its first segments, as returned by generate_segment.
+    Rows are views into the mapped file, so processes that open the same bank
+    share its pages. Pickling a bank only pickles its path.
+
+    File layout: MAGIC, a JSON header line padded to ALIGNMENT, the int64
+    seeds, then the int16 segments of shape (n_courses, n_segments, 2).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a course bank")
+            header = json.loads(f.readline())
+            offset = f.tell()
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported course bank version {header['version']}")
+        self.constants = header["constants"]
+        n_courses = header["n_courses"]
+        n_segments = header["n_segments"]
+        self.seeds = np.memmap(
+            self.path, dtype="<i8", mode="r", offset=offset, shape=(n_courses,)
+        )
+        self.segments = np.memmap(
+            self.path,
+            dtype="<i2",
+            mode="r",
+            offset=offset + self.seeds.nbytes,
+            shape=(n_courses, n_segments, 2),
+        )
+        self.__indices = None
+
+    def __len__(self):
+        return len(self.seeds)
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def course(self, index):
+        """Return the seed and the segments (a zero-copy view) of course `index`."""
+        return int(self.seeds[index]), self.segments[index]
+
+    def index_of(self, seed):
+        """Return the index of the first course of `seed`, or None if there is none."""
+        if self.__indices is None:
+            self.__indices = {}
+            for index, course_seed in enumerate(self.seeds.tolist()):
+                self.__indices.setdefault(course_seed, index)
+        return self.__indices.get(seed)
+
+    def check_config(self, config):
+        """Raise ValueError if `config` would generate different courses."""
+        if _course_constants(config) != self.constants:
+            raise ValueError(
+                f"Course bank {self.path} was built for {self.constants}, "
+                f"not {_course_constants(config)}"
+            )
+
+
+def _fill_courses(path, offset, shape, start, seeds, config):
+    """Generate the courses of `seeds` into the bank rows from `start` on."""
+    segments = np.memmap(path, dtype="<i2", mode="r+", offset=offset, shape=shape)
+    for row, seed in enumerate(seeds, start):
+        segments[row] = [
+            generate_segment(seed, index, config) for index in range(shape[1])
+        ]
+    segments.flush()
+
+
+def build_course_bank(path, seeds, n_segments, workers=None, config=HelicopterGame):
+    """Generate the courses of `seeds` and write them as a bank to `path`."""
+    seeds = np.asarray(seeds, dtype=np.int64)
+    constants = _course_constants(config)
+    if max(abs(value) for value in constants.values()) > np.iinfo(np.int16).max:
+        raise ValueError(f"Segments do not fit in int16: {constants}")
+    header = {
+        "version": VERSION,
+        "n_courses": len(seeds),
+        "n_segments": n_segments,
+        "constants": constants,
+    }
+    header_line = json.dumps(header).encode()
+    padding = -(len(MAGIC) + len(header_line) + 1) % ALIGNMENT
+    header_line += b" " * padding + b"\n"
+    offset = len(MAGIC) + len(header_line)
+    shape = (len(seeds), n_segments, 2)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(header_line)
+        f.write(seeds.astype("<i8").tobytes())
+        f.truncate(offset + seeds.nbytes + int(np.prod(shape)) * 2)
+
+    workers = workers or os.cpu_count() or 1
+    chunk = -(-len(seeds) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _fill_courses,
+                path,
+                offset + seeds.nbytes,
+                shape,
+                start,
+                seeds[start : start + chunk].tolist(),
+                config,
+            )
+            for start in range(0, len(seeds), chunk)
+        ]
+        for future in futures:
+            future.result()
+    return CourseBank(path)
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("out", type=str, help="Path of the course bank file")
+    parser.add_argument("--n-courses", type=int, default=1000)
+    parser.add_argument(
+        "--n-segments",
+        type=int,
+        default=2000,
+        help="Segments stored per course; later ones are generated on the fly",
+    )
+    parser.add_argument(
+        "--first-seed",
+        type=int,
+        default=0,
+        help="Course i is the course of seed first-seed + i",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of generator processes (default: number of CPUs)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bank = build_course_bank(
+        args.out,
+        range(args.first_seed, args.first_seed + args.n_courses),
+        args.n_segments,
+        workers=args.workers,
+    )
+    size = os.path.getsize(args.out)
+    print(
+        f"Wrote {len(bank)} courses of {args.n_segments} segments to {args.out} "
+        f"({size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    _main()
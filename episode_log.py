@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+from helicopter_game import HelicopterGame
+
+MAGIC = b"HELILOG"
+VERSION = 1
+
+
+def game_constants(game_cls=HelicopterGame):
+    """Return the tunable class constants of the game (the upper-case names)."""
+    return {
+        name: getattr(game_cls, name)
+        for name in dir(game_cls)
+        if name.isupper() and isinstance(getattr(game_cls, name), (int, float))
+    }
+
+
+class EpisodeLog:
+    """
+    Compact record of an episode: the course seed, the game constants and the
+    action sequence packed to one bit per step. Replaying the actions on a game
+    built from the log reproduces the episode exactly.
+
+    File layout: MAGIC, a JSON header line, then the packed actions.
+    """
+
+    def __init__(self, seed, actions=(), constants=None):
+        self.seed = seed
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        self.constants = game_constants() if constants is None else constants
+
+    def __len__(self):
+        return len(self.actions)
+
+    def save(self, path):
+        header = {
+            "version": VERSION,
+            "seed": self.seed,
+            "n_actions": len(self.actions),
+            "constants": self.constants,
+        }
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(np.packbits(self.actions).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an episode log")
+            header = json.loads(f.readline())
+            if header["version"] != VERSION:
+                raise ValueError(
+                    f"Unsupported episode log version {header['version']}"
+                )
+            packed = np.frombuffer(f.read(), dtype=np.uint8)
+        actions = np.unpackbits(packed, count=header["n_actions"])
+        return cls(header["seed"], actions, header["constants"])
+
+    def make_game(self, render_mode=None):
+        """Create a game with the logged constants, reset to the logged course."""
+        game = HelicopterGame(render_mode=render_mode)
+        for name, value in self.constants.items():
+            setattr(game, name, value)
+        game.reset(seed=self.seed)
+        return game
+
+
+class EpisodeRecorder:
+    """
+    Collect the actions of an env's current episode into an EpisodeLog.
+    Call `record` with each action before passing it to `env.step`.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.log = None
+
+    def reset(self):
+        self.log = EpisodeLog(self.env.game.seed)
+        self.__actions = []
+
+    def record(self, action):
+        if not self.env.game.game_over:
+            self.__actions.append(int(action))
+
+    def finish(self):
+        assert self.log is not None, "reset must be called first"
+        self.log.actions = np.asarray(self.__actions, dtype=np.uint8)
+        return self.log
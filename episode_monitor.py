@@ -0,0 +1,194 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+MAGIC = b"HELIMON"
+VERSION = 1
+EXT = "monitor.bin"
+# One record per finished episode, with the columns of an SB3 monitor.csv
+EPISODE_DTYPE = np.dtype([("r", "<f8"), ("l", "<i8"), ("t", "<f8")])
+
+
+class BufferedVecMonitor(VecEnvWrapper):
+    """
+    Drop-in replacement for VecMonitor that buffers finished episodes.
+
+    Episode returns and lengths are tracked in per-env arrays and finished
+    episodes are collected in a preallocated record array. It is appended to
+    `<log_dir>/monitor.bin` when `buffer_size` episodes are pending or
+    `flush_interval` seconds have passed since the last write, and on close.
+
+    File layout: MAGIC, a JSON header line, then EPISODE_DTYPE records.
+    """
+
+    def __init__(self, venv, log_dir=None, buffer_size=4096, flush_interval=10.0):
+        super().__init__(venv)
+        self.t_start = time.time()
+        self.buffer = np.zeros(buffer_size, dtype=EPISODE_DTYPE)
+        self.pending = 0
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.episode_returns = np.zeros(self.num_envs, dtype=np.float64)
+        self.episode_lengths = np.zeros(self.num_envs, dtype=np.int64)
+        self.episode_count = 0
+
+        self.file = None
+        if log_dir is not None:
+            os.makedirs(log_dir, exist_ok=True)
+            self.file = open(os.path.join(log_dir, EXT), "wb")
+            header = {"version": VERSION, "t_start": self.t_start}
+            self.file.write(MAGIC)
+            self.file.write(json.dumps(header).encode() + b"\n")
+            self.file.flush()
+
+    def reset(self):
+        self.episode_returns[:] = 0
+        self.episode_lengths[:] = 0
+        return self.venv.reset()
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        self.episode_returns += rewards
+        self.episode_lengths += 1
+
+        done = np.flatnonzero(dones)
+        if len(done):
+            t = round(time.time() - self.t_start, 6)
+            for i in done:
+                # The rollout collector reads these for rollout/ep_rew_mean
+                info = dict(infos[i])
+                info["episode"] = {
+                    "r": float(self.episode_returns[i]),
+                    "l": int(self.episode_lengths[i]),
+                    "t": t,
+                }
+                infos[i] = info
+            self.__append(done, t)
+            self.episode_returns[done] = 0
+            self.episode_lengths[done] = 0
+        return obs, rewards, dones, infos
+
+    def __append(self, done, t):
+        self.episode_count += len(done)
+        while len(done):
+            n = min(len(done), len(self.buffer) - self.pending)
+            records = self.buffer[self.pending : self.pending + n]
+            records["r"] = self.episode_returns[done[:n]]
+            records["l"] = self.episode_lengths[done[:n]]
+            records["t"] = t
+            self.pending += n
+            done = done[n:]
+            if self.pending == len(self.buffer):
+                self.flush()
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.file is not None and self.pending:
+            self.file.write(self.buffer[: self.pending].tobytes())
+            self.file.flush()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return self.venv.close()
+
+
+def read_monitor(path):
+    """Return the header and the episode records of one monitor.bin file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an episode monitor log")
+        header = json.loads(f.readline())
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported episode monitor version {header['version']}")
+        data = f.read()
+    # A reader may race a write; ignore a trailing partial record
+    usable = len(data) - len(data) % EPISODE_DTYPE.itemsize
+    return header, np.frombuffer(data[:usable], dtype=EPISODE_DTYPE)
+
+
+def load_episodes(log_dir):
+    """
+    Return the episodes of every monitor.bin under `log_dir` as one record
+    array sorted by time, with "t" relative to the earliest start.
+    """
+    paths = glob.glob(os.path.join(log_dir, "*" + EXT))
+    if not paths:
+        return np.zeros(0, dtype=EPISODE_DTYPE)
+    logs = [read_monitor(path) for path in paths]
+    t_start = min(header["t_start"] for header, _ in logs)
+    episodes = np.concatenate(
+        [
+            _shift_time(records, header["t_start"] - t_start)
+            for header, records in logs
+        ]
+    )
+    return episodes[np.argsort(episodes["t"], kind="stable")]
+
+
+def _shift_time(records, offset):
+    records = records.copy()
+    records["t"] += offset
+    return records
+
+
+def load_results(log_dir):
+    """
+    Load the episodes under `log_dir` as the DataFrame SB3's
+    `monitor.load_results` returns, for use with `results_plotter`.
+    """
+    import pandas
+
+    episodes = load_episodes(log_dir)
+    return pandas.DataFrame(
+        {"r": episodes["r"], "l": episodes["l"], "t": episodes["t"]}
+    )
+
+
+def export_csv(log_dir, out_path):
+    """Write the episodes under `log_dir` in the SB3 monitor.csv format."""
+    episodes = load_episodes(log_dir)
+    with open(out_path, "w", newline="") as f:
+        f.write("#" + json.dumps({"t_start": 0.0, "env_id": "None"}) + "\n")
+        writer = csv.writer(f)
+        writer.writerow(["r", "l", "t"])
+        for r, l, t in episodes.tolist():
+            writer.writerow([round(r, 6), l, t])
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log_dir", type=str, help="Directory with monitor.bin logs")
+    parser.add_argument(
+        "--csv",
+        type=str,
+        help="Export the episodes to this file in the monitor.csv format",
+    )
+    args = parser.parse_args()
+
+    episodes = load_episodes(args.log_dir)
+    if args.csv:
+        export_csv(args.log_dir, args.csv)
+    if len(episodes):
+        recent = episodes[-100:]
+        print(
+            f"{len(episodes)} episodes, last 100: mean reward "
+            f"{recent['r'].mean():.1f}, mean length {recent['l'].mean():.1f}"
+        )
+    else:
+        print("No episodes")
+
+
+if __name__ == "__main__":
+    _main()
@@ -3,8 +3,8 @@ import subprocess
 import time
 from pathlib import Path
 
+from episode_log import EpisodeRecorder
 from helicopter_env import HelicopterEnv
-from stable_baselines3 import PPO
 
 
 class VideoWriter:
@@ -56,23 +56,38 @@ class VideoWriter:
             self.video_proc = None
 
 
-def eval_agent(out_video=None, model_path=None):
+def eval_agent(
+    out_video=None, model_path=None, out_log=None, headless=False, seed=None
+):
+    from stable_baselines3 import PPO
+
     n_steps = 3000
-    env = HelicopterEnv(render_mode="rgb_array" if out_video else "human")
+    if headless:
+        render_mode = None
+    else:
+        render_mode = "rgb_array" if out_video else "human"
+    env = HelicopterEnv(render_mode=render_mode)
     model = PPO.load(model_path, env=env)
-    reset_result = env.reset()
+    reset_result = env.reset(seed=seed)
     obs, _ = reset_result
 
-    video_writer = VideoWriter(out_video) if out_video else None
+    video_writer = VideoWriter(out_video) if out_video and not headless else None
+    recorder = EpisodeRecorder(env) if out_log else None
+    if recorder:
+        recorder.reset()
 
     for step in range(n_steps):
         action, _ = model.predict(obs)
-        print(f"Step {step + 1}")
-        print("Action: ", action)
+        if recorder:
+            recorder.record(action)
+        if not headless:
+            print(f"Step {step + 1}")
+            print("Action: ", action)
         step_result = env.step(action)
         obs, reward, terminated, truncated, info = step_result
         truncated = False
-        print("obs=", obs, "reward=", reward, "done=", terminated or truncated)
+        if not headless:
+            print("obs=", obs, "reward=", reward, "done=", terminated or truncated)
         if video_writer:
             frame = env.render()
             if terminated:
@@ -83,14 +98,18 @@ def eval_agent(out_video=None, model_path=None):
             else:
                 video_writer.write(frame)
 
-        else:
+        elif not headless:
             env.render()
-        time.sleep(0.01)
+        if not headless:
+            time.sleep(0.01)
         if terminated or truncated:
             print("Goal reached!", "reward=", reward)
             break
     if video_writer:
         video_writer.close()
+    if recorder:
+        recorder.finish().save(out_log)
+        print(f"Episode log ({step + 1} steps) saved to {out_log}")
 
     env.close()
 
@@ -99,6 +118,17 @@ def _main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--out-video", type=str)
     parser.add_argument("--model", type=str)
+    parser.add_argument(
+        "--out-log",
+        type=str,
+        help="Write a compact episode log that rerender.py can turn into a video",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run at full speed without rendering or printing every step",
+    )
+    parser.add_argument("--seed", type=int, help="Course seed")
     args = parser.parse_args()
 
     model = args.model
@@ -109,7 +139,13 @@ def _main():
             raise FileNotFoundError("No model checkpoint found; specify --model.")
         model = str(model_files[-1])
 
-    eval_agent(out_video=args.out_video, model_path=model)
+    eval_agent(
+        out_video=args.out_video,
+        model_path=model,
+        out_log=args.out_log,
+        headless=args.headless,
+        seed=args.seed,
+    )
 
 
 if __name__ == "__main__":
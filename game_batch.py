@@ -0,0 +1,304 @@
+import math
+import os
+
+import numpy as np
+from helicopter_env import HelicopterEnv
+from helicopter_game import HelicopterGame, generate_segment
+from helicopter_reward import compute_reward
+from shared_course import ArrayVecEnv, check_crashes, update_helicopters
+
+
+class TunnelBatch:
+    """
+    The tunnels of many independent courses in fixed-size point arrays.
+
+    Row i holds the `count[i]` on-screen points of course i, generated from
+    its seed exactly as Tunnel does, so each row matches a Tunnel on the same
+    seed point for point. Rows reset with a course of `bank` (a CourseBank)
+    read their segments from it instead of generating them.
+    """
+
+    __slots__ = (
+        "config",
+        "bank",
+        "x",
+        "y",
+        "count",
+        "seed",
+        "bank_index",
+        "segment_index",
+    )
+
+    def __init__(self, n_courses, config=HelicopterGame, bank=None):
+        self.config = config
+        self.bank = bank
+        # On-screen points span the width plus at most one segment on either
+        # side, and one more can be appended before the first is dropped
+        capacity = (
+            math.ceil(
+                (config.WIDTH + 2 * config.TUNNEL_SEGMENT_MAX)
+                / config.TUNNEL_SEGMENT_MIN
+            )
+            + 3
+        )
+        self.x = np.zeros((n_courses, capacity), dtype=np.float64)
+        self.y = np.zeros((n_courses, capacity), dtype=np.float64)
+        self.count = np.zeros(n_courses, dtype=np.int64)
+        self.seed = np.zeros(n_courses, dtype=np.int64)
+        self.bank_index = np.full(n_courses, -1, dtype=np.int64)
+        self.segment_index = np.zeros(n_courses, dtype=np.int64)
+
+    def reset(self, indices, seeds, bank_indices=-1):
+        config = self.config
+        self.seed[indices] = seeds
+        self.bank_index[indices] = bank_indices
+        self.segment_index[indices] = 0
+        self.count[indices] = 2
+        self.x[indices, 0] = 0.0
+        self.x[indices, 1] = config.WIDTH // 2
+        self.y[indices, :2] = config.HEIGHT / 2
+        self.scroll(np.asarray(indices))
+
+    def scroll(self, indices=None):
+        """Advance the given courses (default: all) by one frame."""
+        config = self.config
+        if indices is None:
+            self.x -= config.HELICOPTER_SPEED_X
+            indices = np.arange(len(self.count))
+        else:
+            self.x[indices] -= config.HELICOPTER_SPEED_X
+
+        x, y, count = self.x, self.y, self.count
+        grow = indices[x[indices, count[indices] - 1] < config.WIDTH]
+        while len(grow):
+            generate = grow
+            if self.bank is not None:
+                segments = self.bank.segments
+                banked = (self.bank_index[grow] >= 0) & (
+                    self.segment_index[grow] < segments.shape[1]
+                )
+                rows = grow[banked]
+                if len(rows):
+                    dx, offset = (
+                        segments[self.bank_index[rows], self.segment_index[rows]]
+                        .astype(np.float64)
+                        .T
+                    )
+                    n = count[rows]
+                    x[rows, n] = x[rows, n - 1] + dx
+                    y[rows, n] = config.HEIGHT * 0.5 + offset
+                    count[rows] += 1
+                    self.segment_index[rows] += 1
+                generate = grow[~banked]
+            for i in generate.tolist():
+                dx, offset = generate_segment(
+                    int(self.seed[i]), int(self.segment_index[i]), config
+                )
+                self.segment_index[i] += 1
+                n = count[i]
+                x[i, n] = x[i, n - 1] + dx
+                y[i, n] = config.HEIGHT * 0.5 + offset
+                count[i] = n + 1
+            grow = grow[x[grow, count[grow] - 1] < config.WIDTH]
+
+        shrink = indices[x[indices, 1] < 0]
+        while len(shrink):
+            x[shrink, :-1] = x[shrink, 1:]
+            y[shrink, :-1] = y[shrink, 1:]
+            count[shrink] -= 1
+            shrink = shrink[x[shrink, 1] < 0]
+
+    def center_y(self, x_pos):
+        """Return the centerline height of every course at horizontal `x_pos`."""
+        x, y = self.x, self.y
+        valid = np.arange(x.shape[1] - 1) < (self.count - 1)[:, None]
+        inside = valid & (x[:, :-1] <= x_pos) & (x_pos <= x[:, 1:])
+        assert inside.any(axis=1).all(), "Center y should be found"
+        left = inside.argmax(axis=1)[:, None]
+        left_x = np.take_along_axis(x, left, axis=1)[:, 0]
+        right_x = np.take_along_axis(x, left + 1, axis=1)[:, 0]
+        left_y = np.take_along_axis(y, left, axis=1)[:, 0]
+        right_y = np.take_along_axis(y, left + 1, axis=1)[:, 0]
+        ratio = (x_pos - left_x) / (right_x - left_x)
+        return left_y + (right_y - left_y) * ratio
+
+    def points(self, index):
+        n = self.count[index]
+        return list(zip(self.x[index, :n].tolist(), self.y[index, :n].tolist()))
+
+
+class GameBatch:
+    """
+    Many independent games, each on its own course, as a handful of arrays.
+
+    Game i follows exactly the trajectory of a HelicopterGame reset with
+    `seeds[i]` and given the same actions. Nothing is drawn, so the batch holds
+    no surfaces, sprites or trail; constants are read from `config`.
+    """
+
+    __slots__ = (
+        "config",
+        "course",
+        "pos_y",
+        "speed_y",
+        "alive",
+        "distance",
+        "frame_index",
+    )
+
+    def __init__(self, n_games, config=HelicopterGame, bank=None):
+        self.config = config
+        self.course = TunnelBatch(n_games, config, bank)
+        self.pos_y = np.zeros(n_games, dtype=np.float64)
+        self.speed_y = np.zeros(n_games, dtype=np.float64)
+        self.alive = np.zeros(n_games, dtype=bool)
+        self.distance = np.zeros(n_games, dtype=np.int64)
+        self.frame_index = np.zeros(n_games, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.pos_y)
+
+    def reset(self, indices, seeds, bank_indices=-1):
+        """
+        Start new courses with the given seeds in the given slots, read from
+        the given courses of the bank where `bank_indices` is not -1.
+        """
+        self.course.reset(indices, seeds, bank_indices)
+        self.pos_y[indices] = self.config.HEIGHT / 2
+        self.speed_y[indices] = 0
+        self.alive[indices] = True
+        self.distance[indices] = 0
+        self.frame_index[indices] = 0
+
+    def center_y(self):
+        return self.course.center_y(self.config.HELICOPTER_POS_X)
+
+    def step(self, actions):
+        """Advance all live games one frame; return the games that crashed."""
+        config = self.config
+        alive = self.alive
+        self.frame_index[alive] += 1
+        self.distance[alive] += config.HELICOPTER_SPEED_X
+        update_helicopters(config, self.pos_y, self.speed_y, alive, actions)
+
+        self.course.scroll(np.flatnonzero(alive))
+
+        crashed = alive & check_crashes(config, self.pos_y, self.center_y())
+        self.alive &= ~crashed
+        return crashed
+
+    def observations(self, indices=slice(None)):
+        """Observations of the given games (default: all), as in HelicopterEnv."""
+        config = self.config
+        steps = HelicopterEnv.MAX_TUNNEL_STEPS
+        course = self.course
+        pos_y = self.pos_y[indices]
+        obs = np.empty((len(pos_y), 2 + steps * 2), dtype=np.float32)
+        obs[:, 0] = pos_y / config.HEIGHT
+        obs[:, 1] = self.speed_y[indices] / config.HELICOPTER_SPEED_Y_MAX * 0.5 + 0.5
+        present = np.arange(steps) < course.count[indices, None]
+        x = course.x[indices, :steps]
+        y = course.y[indices, :steps]
+        obs[:, 2::2] = np.where(present, (x + config.WIDTH) / (config.WIDTH * 3), 1.0)
+        obs[:, 3::2] = np.where(present, y / config.HEIGHT, 0.5)
+        return obs
+
+    def get_scene(self, index):
+        """Return game `index` in the form of HelicopterEnv.get_scene."""
+        return (
+            self.course.points(index),
+            float(self.pos_y[index]),
+            float(self.speed_y[index]),
+            not bool(self.alive[index]),
+            int(self.frame_index[index]),
+        )
+
+
+class GameBatchVecEnv(ArrayVecEnv):
+    """
+    VecEnv over a GameBatch: the same observations, rewards and auto-reset
+    as a DummyVecEnv of HelicopterEnvs at a few hundred bytes per env.
+
+    Every env starts a new course, drawn from `seed`, as soon as it crashes;
+    with a `course_bank` (a CourseBank or its path) the courses are drawn from
+    the bank.
+    To keep per-step overhead flat at thousands of envs, infos are empty
+    except on the step an episode ends; the reward terms of a step are
+    reported as their means over all envs in `reward_term_means`. Only
+    render mode "mosaic" (through mosaic.VecMosaic) is supported.
+    """
+
+    def __init__(
+        self,
+        n_envs,
+        reward_mode="survival",
+        seed=None,
+        config=HelicopterGame,
+        course_bank=None,
+    ):
+        if isinstance(course_bank, (str, os.PathLike)):
+            from course_bank import CourseBank
+
+            course_bank = CourseBank(course_bank)
+        if course_bank is not None:
+            course_bank.check_config(config)
+        self.course_bank = course_bank
+        self.game = GameBatch(n_envs, config, course_bank)
+        self.rng = np.random.default_rng(seed)
+        self.reward_term_means = {}
+        super().__init__(n_envs, reward_mode)
+
+    def __new_courses(self, indices):
+        if self.course_bank is None:
+            seeds = self.rng.integers(2**32, size=len(indices))
+            self.game.reset(indices, seeds)
+        else:
+            bank_indices = self.rng.integers(len(self.course_bank), size=len(indices))
+            seeds = self.course_bank.seeds[bank_indices]
+            self.game.reset(indices, seeds, bank_indices)
+
+    def reset(self):
+        self.__new_courses(np.arange(self.num_envs))
+        # An explicit seed selects the env's first course
+        seeded = [index for index, seed in enumerate(self._seeds) if seed is not None]
+        if seeded:
+            seeds = [self._seeds[index] for index in seeded]
+            bank_indices = -1
+            if self.course_bank is not None:
+                bank_indices = [
+                    -1 if index is None else index
+                    for index in map(self.course_bank.index_of, seeds)
+                ]
+            self.game.reset(seeded, seeds, bank_indices)
+        self._reset_seeds()
+        return self.game.observations()
+
+    def get_scene(self, index):
+        """Return env `index` in the form of HelicopterEnv.get_scene."""
+        return self.game.get_scene(index)
+
+    def step_wait(self):
+        game = self.game
+        crashed = game.step(self.actions)
+        total, terms = compute_reward(
+            self.reward_mode, game.pos_y, game.speed_y, game.center_y(), crashed
+        )
+        rewards = total.astype(np.float32)
+        self.reward_term_means = {
+            name: float(value.mean()) for name, value in terms.items()
+        }
+        infos = [{} for _ in range(self.num_envs)]
+
+        done = np.flatnonzero(crashed)
+        if len(done):
+            terminal = game.observations(done)
+            for i, observation in zip(done.tolist(), terminal):
+                infos[i] = {
+                    "game_over": True,
+                    "course_seed": int(game.course.seed[i]),
+                    "distance": int(game.distance[i]),
+                    "pos_y": float(game.pos_y[i]),
+                    "terminal_observation": observation,
+                }
+            self.__new_courses(done)
+        return game.observations(), rewards, crashed, infos
@@ -1,19 +1,39 @@
+import os
 from typing import Literal
 
 import numpy as np
-import pygame
 from gymnasium import Env, spaces
 from helicopter_game import HelicopterGame
+from helicopter_reward import REWARD_MODES, compute_reward, compute_step_reward
 
 
 class HelicopterEnv(Env):
     metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 60}
     MAX_TUNNEL_STEPS = 4
 
-    def __init__(self, render_mode: Literal["human", "rgb_array"] = "human"):
+    def __init__(
+        self,
+        render_mode: Literal["human", "rgb_array"] = "human",
+        reward_mode: str = "survival",
+        course_bank=None,
+    ):
         super().__init__()
+        if reward_mode not in REWARD_MODES:
+            raise ValueError(
+                f"Unknown reward mode {reward_mode!r}, "
+                f"expected one of {sorted(REWARD_MODES)}"
+            )
         self.render_mode = render_mode
+        self.reward_mode = reward_mode
         self.game = HelicopterGame(render_mode=render_mode)
+        # A CourseBank or the path of one, to fly pre-generated courses
+        if isinstance(course_bank, (str, os.PathLike)):
+            from course_bank import CourseBank
+
+            course_bank = CourseBank(course_bank)
+        if course_bank is not None:
+            course_bank.check_config(self.game)
+        self.course_bank = course_bank
         self.action_space = spaces.Discrete(2)
         self.observation_space = spaces.Box(
             low=0.0,
@@ -25,7 +45,27 @@ class HelicopterEnv(Env):
 
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
-        self.game.reset()
+        index = None
+        if self.course_bank is not None:
+            # Fly course options["course"] of the bank, or a random one
+            index = (options or {}).get("course")
+            if seed is not None:
+                if index is not None:
+                    raise ValueError("Pass either a seed or a course, not both")
+                # The seed selects the course as without a bank; it is read
+                # from the bank if the bank holds it
+                index = self.course_bank.index_of(seed)
+            elif index is None:
+                index = int(self.np_random.integers(len(self.course_bank)))
+        if index is not None:
+            seed, segments = self.course_bank.course(index)
+            self.game.reset(seed=seed, segments=segments)
+        else:
+            # An explicit seed selects the course; otherwise draw one from the
+            # env's RNG so every episode's course can be reproduced
+            if seed is None:
+                seed = int(self.np_random.integers(2**32))
+            self.game.reset(seed=seed)
         observation = self.__get_obs()
         info = self.__get_info()
         return observation, info
@@ -36,17 +76,61 @@ class HelicopterEnv(Env):
         self.game.step()
 
         observation = self.__get_obs()
-        reward = 0.0 if self.game.game_over else 1.0
+        reward, terms = compute_step_reward(
+            self.reward_mode,
+            self.game.helicopter_pos_y,
+            self.game.helicopter_speed_y,
+            self.game.last_center_y,
+            self.game.game_over,
+        )
         terminated = self.game.game_over
         truncated = False
         info = self.__get_info()
+        info["reward_terms"] = terms
         return observation.astype(np.float32), reward, terminated, truncated, info
 
+    def step_hold(self, action, max_frames):
+        """
+        Repeat `action` for up to `max_frames` frames, or until the episode
+        ends, jumping a tunnel segment at a time with HelicopterGame.step_hold.
+
+        Returns what `step` returns, with the reward and each reward term
+        summed over all frames in order and the number of frames advanced in
+        info["frames"]; the result equals calling `step` that many times.
+        """
+        assert self.action_space.contains(action)
+        frames = 0
+        reward = 0.0
+        reward_terms = dict.fromkeys(REWARD_MODES[self.reward_mode], 0.0)
+        while frames < max_frames and not self.game.game_over:
+            pos_y, speed_y, center_y = self.game.step_hold(
+                int(action), max_frames - frames
+            )
+            game_over = np.zeros(len(pos_y), dtype=bool)
+            game_over[-1] = self.game.game_over
+            total, terms = compute_reward(
+                self.reward_mode, pos_y, speed_y, center_y, game_over
+            )
+            for value in total.tolist():
+                reward += value
+            for name, values in terms.items():
+                for value in values.tolist():
+                    reward_terms[name] += value
+            frames += len(pos_y)
+
+        observation = self.__get_obs()
+        info = self.__get_info()
+        info["reward_terms"] = reward_terms
+        info["frames"] = frames
+        return observation.astype(np.float32), reward, self.game.game_over, False, info
+
     def render(self):
         if self.render_mode == "human":
             self.game.draw()
             return None
         if self.render_mode == "rgb_array":
+            import pygame
+
             original_surface = self.game.surface
             original_screen = self.game.screen
             self.game.surface = pygame.Surface((self.game.WIDTH, self.game.HEIGHT))
@@ -57,8 +141,24 @@ class HelicopterEnv(Env):
             self.game.screen = original_screen
             return array
 
+    def get_scene(self):
+        """Return the minimal, picklable state drawn by mosaic.MosaicRenderer."""
+        game = self.game
+        return (
+            [(t.x, t.y) for t in game.tunnel],
+            game.helicopter_pos_y,
+            game.helicopter_speed_y,
+            game.game_over,
+            game.frame_index,
+        )
+
     def __get_info(self):
-        return {"game_over": self.game.game_over}
+        return {
+            "game_over": self.game.game_over,
+            "course_seed": self.game.seed,
+            "distance": self.game.distance,
+            "pos_y": self.game.helicopter_pos_y,
+        }
 
     def __get_obs(self):
         player = np.array(
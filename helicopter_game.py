@@ -1,10 +1,33 @@
+import importlib.util
 import math
 import random
 import sys
+from collections import deque
 from pathlib import Path
 from typing import Literal
 import os
-import pygame
+
+import numpy as np
+
+
+def _lazy_import(name):
+    """Import a module on first attribute access instead of right away."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Headless simulation never touches pygame, so only pay for importing it
+# once something is drawn.
+pygame = _lazy_import("pygame")
+
+ASSET_DIR = Path(__file__).resolve().parent / "assets"
 
 
 def _get_jagged_boundary(
@@ -42,16 +65,178 @@ def _get_jagged_boundary(
     ]
 
 
+class TunnelPoint:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def generate_segment(seed, segment_index, config):
+    """
+    Return the (dx, offset) of a course's segment: the horizontal distance to
+    the new point and its height relative to the screen middle. Every segment
+    has its own RNG, so any segment can be generated independently.
+    """
+    rng = random.Random((seed << 32) + segment_index)
+    dx = rng.randint(config.TUNNEL_SEGMENT_MIN, config.TUNNEL_SEGMENT_MAX)
+    offset = rng.randint(
+        -config.TUNNEL_CENTER_OFFSET_MAX, config.TUNNEL_CENTER_OFFSET_MAX
+    )
+    return dx, offset
+
+
+class Tunnel:
+    """
+    Scrolling piecewise-linear tunnel centerline. The course is determined by
+    its seed: each new point comes from an RNG seeded with the course seed and
+    the point's index. Constants are read from `config`, a HelicopterGame
+    instance or class.
+
+    `segments`, e.g. a row of a course_bank.CourseBank, supplies
+    pre-generated segments of the course; points past its end are generated.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.reset()
+
+    def reset(self, seed=None, segments=None):
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.segments = segments
+        self.segment_index = 0
+        self.points = [
+            TunnelPoint(0.0, self.config.HEIGHT / 2),
+            TunnelPoint(self.config.WIDTH // 2, self.config.HEIGHT / 2),
+        ]
+        self.scroll()
+
+    def scroll(self, frames=1):
+        """
+        Advance the tunnel by `frames` frames. Points are appended and dropped
+        as frame by frame; positions stay whole numbers, so one shift by the
+        total distance is exact.
+        """
+        config = self.config
+        for pt in self.points:
+            pt.x -= config.HELICOPTER_SPEED_X * frames
+
+        while self.points[-1].x < config.WIDTH:
+            if self.segments is not None and self.segment_index < len(self.segments):
+                dx, offset = (int(value) for value in self.segments[self.segment_index])
+            else:
+                dx, offset = generate_segment(self.seed, self.segment_index, config)
+            self.segment_index += 1
+            self.points.append(
+                TunnelPoint(self.points[-1].x + dx, config.HEIGHT * 0.5 + offset)
+            )
+        while self.points[1].x < 0:
+            self.points.pop(0)
+
+    def center_y(self, x):
+        """Return the centerline height at horizontal position `x`."""
+        for i in range(len(self.points) - 1):
+            left = self.points[i]
+            right = self.points[i + 1]
+            if left.x <= x <= right.x:
+                ratio = (x - left.x) / (right.x - left.x)
+                return left.y + (right.y - left.y) * ratio
+        raise AssertionError("Center y should be found")
+
+    def get_state(self):
+        return {
+            "seed": self.seed,
+            "segment_index": self.segment_index,
+            "tunnel": [(pt.x, pt.y) for pt in self.points],
+        }
+
+    def set_state(self, state):
+        # Pre-generated segments equal generated ones, so generating is exact
+        self.segments = None
+        self.seed = state["seed"]
+        self.segment_index = state["segment_index"]
+        self.points = [TunnelPoint(x, y) for x, y in state["tunnel"]]
+
+
+def _convert_frame(frame):
+    """Copy a sprite frame into the per-pixel alpha format of the render target."""
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return frame.convert_alpha()
+    # Without a display, build the ARGB surface by hand. Additive blending onto
+    # a transparent surface copies the pixels, alpha included, unchanged.
+    converted = pygame.Surface(frame.get_size(), pygame.SRCALPHA, 32)
+    converted.blit(frame, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    return converted
+
+
 class SpriteSheet:
+    """
+    Animation frames sliced from a sprite sheet once, converted to the render
+    target format so blits skip per-pixel format conversion. Scaled variants
+    are built on first request and kept.
+    """
+
     def __init__(self, path, frame_rects):
-        self.sheet = pygame.image.load(str(path))
+        sheet = pygame.image.load(str(path))
         self.rects = frame_rects
         self.frame_count = len(self.rects)
+        self.__frames = {
+            1: [_convert_frame(sheet.subsurface(rect)) for rect in self.rects]
+        }
 
-    def get_frame(self, index):
+    def get_frame(self, index, scale=1):
         index %= self.frame_count
-        rect = self.rects[index]
-        return self.sheet.subsurface(rect)
+        return self.get_frames(scale)[index]
+
+    def get_frames(self, scale=1):
+        if scale not in self.__frames:
+            self.__frames[scale] = [
+                pygame.transform.scale(
+                    frame,
+                    (
+                        max(1, round(frame.get_width() * scale)),
+                        max(1, round(frame.get_height() * scale)),
+                    ),
+                )
+                for frame in self.__frames[1]
+            ]
+        return self.__frames[scale]
+
+
+_sprite_sheets = {}
+
+
+def get_sprite_sheet(path, frame_rects):
+    """Return the process-wide SpriteSheet for `path`, loading it on first use."""
+    key = (str(path), tuple(tuple(rect) for rect in frame_rects))
+    if key not in _sprite_sheets:
+        _sprite_sheets[key] = SpriteSheet(path, frame_rects)
+    return _sprite_sheets[key]
+
+
+def get_helicopter_sprite():
+    """Return the shared helicopter sprite: two thrust and two falling frames."""
+    return get_sprite_sheet(
+        ASSET_DIR / "helicopter.png",
+        [
+            pygame.Rect(0, 0, 29, 20),
+            pygame.Rect(29, 0, 29, 20),
+            pygame.Rect(0, 20, 29, 20),
+            pygame.Rect(29, 20, 29, 20),
+        ],
+    )
+
+
+def get_explosion_sprite():
+    return get_sprite_sheet(
+        ASSET_DIR / "explosion.png",
+        [
+            pygame.Rect(0, 0, 32, 24),
+            pygame.Rect(32, 0, 32, 24),
+            pygame.Rect(0, 0, 32, 24),
+        ],
+    )
 
 
 class HelicopterGame:
@@ -81,10 +266,8 @@ class HelicopterGame:
         self.screen = None
         self.clock = None
 
-        if not pygame.get_init():
-            pygame.init()
-
         if render_mode == "human":
+            pygame.init()
             self.screen = pygame.display.set_mode(
                 (
                     self.WIDTH * self.SCALE,
@@ -94,53 +277,31 @@ class HelicopterGame:
             pygame.display.set_caption("Helicopter Game")
             self.clock = pygame.time.Clock()
 
-        self.surface = pygame.Surface((self.WIDTH, self.HEIGHT))
-
-        asset_dir = Path(__file__).resolve().parent / "assets"
-        self.helicopter_sprite = SpriteSheet(
-            asset_dir / "helicopter.png",
-            [
-                pygame.Rect(0, 0, 29, 20),
-                pygame.Rect(29, 0, 29, 20),
-                pygame.Rect(0, 20, 29, 20),
-                pygame.Rect(29, 20, 29, 20),
-            ],
-        )
-        self.explosion_sprite = SpriteSheet(
-            asset_dir / "explosion.png",
-            [
-                pygame.Rect(0, 0, 32, 24),
-                pygame.Rect(32, 0, 32, 24),
-                pygame.Rect(0, 0, 32, 24),
-            ],
-        )
-
-        # font_path = str(asset_dir / "ark-pixel-12px-monospaced-zh_cn.ttf")
-        # self.font = pygame.font.Font(font_path, 12 * 2)
-        # self.info_font = pygame.font.Font(font_path, 12)
-        # self.distance_font = pygame.font.Font(font_path, 18)
-
-        # font_path = asset_dir / "ark-pixel-12px-monospaced-zh_cn.ttf"
-        # if font_path.exists():
-        #     font_path_str = str(font_path)
-        #     self.font = pygame.font.Font(font_path_str, 12 * 2)
-        #     self.info_font = pygame.font.Font(font_path_str, 12)
-        #     self.distance_font = pygame.font.Font(font_path_str, 18)
-        # else:
-        #     print(
-        #         f"Warning: font file not found at {font_path}, "
-        #         "using default system font instead."
-        #     )
-        self.font = pygame.font.SysFont("Arial", 12 * 2)
-        self.info_font = pygame.font.SysFont("Arial", 12)
-        self.distance_font = pygame.font.SysFont("Arial", 18)
+        # Surfaces, sprites and fonts are created on the first draw
+        self.surface = None
+        self.helicopter_sprite = None
+        self.explosion_sprite = None
+        self.font = None
+        self.info_font = None
+        self.distance_font = None
 
         self.is_running = True
         self.show_debug_info = True
 
+        self.course = Tunnel(self)
         self.reset()
 
     def draw(self):
+        if self.surface is None:
+            # Match the display format so scaling into it needs no conversion
+            self.surface = (
+                pygame.Surface((self.WIDTH, self.HEIGHT), 0, self.screen)
+                if self.screen
+                else pygame.Surface((self.WIDTH, self.HEIGHT))
+            )
+        if self.helicopter_sprite is None:
+            self.__load_assets()
+
         self.__draw_background()
         self.__draw_stars()
         self.__draw_tunnel()
@@ -154,33 +315,90 @@ class HelicopterGame:
         self.__draw_debug_info()
 
         if self.screen:
-            scaled = pygame.transform.scale(
-                self.surface,
-                (
-                    self.WIDTH * self.SCALE,
-                    self.HEIGHT * self.SCALE,
-                ),
-            )
-            self.screen.blit(scaled, (0, 0))
+            # Scale straight into the display surface rather than allocating
+            # a new window-sized surface every frame
+            pygame.transform.scale(self.surface, self.screen.get_size(), self.screen)
             pygame.display.flip()
 
-    def reset(self):
+    def __load_assets(self):
+        self.helicopter_sprite = get_helicopter_sprite()
+        self.explosion_sprite = get_explosion_sprite()
+
+        # font_path = str(asset_dir / "ark-pixel-12px-monospaced-zh_cn.ttf")
+        # self.font = pygame.font.Font(font_path, 12 * 2)
+        # self.info_font = pygame.font.Font(font_path, 12)
+        # self.distance_font = pygame.font.Font(font_path, 18)
+
+        # font_path = asset_dir / "ark-pixel-12px-monospaced-zh_cn.ttf"
+        # if font_path.exists():
+        #     font_path_str = str(font_path)
+        #     self.font = pygame.font.Font(font_path_str, 12 * 2)
+        #     self.info_font = pygame.font.Font(font_path_str, 12)
+        #     self.distance_font = pygame.font.Font(font_path_str, 18)
+        # else:
+        #     print(
+        #         f"Warning: font file not found at {font_path}, "
+        #         "using default system font instead."
+        #     )
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self.font = pygame.font.SysFont("Arial", 12 * 2)
+        self.info_font = pygame.font.SysFont("Arial", 12)
+        self.distance_font = pygame.font.SysFont("Arial", 18)
+        # Text that never changes and the distance overlay are rendered once
+        self.__static_text = {}
+        self.__distance_overlay = None
+
+    def reset(self, seed=None, segments=None):
         self.game_over = False
         self.action = 0  # 0: do nothing, 1: move up
 
-        self.tunnel = [
-            pygame.Vector2(0.0, self.HEIGHT / 2),
-            pygame.Vector2(self.WIDTH // 2, self.HEIGHT / 2),
-        ]
-        self.__update_tunnel()
+        self.course.reset(seed, segments)
 
         self.helicopter_pos_y = self.HEIGHT / 2
         self.helicopter_speed_y = 0
-        self.__trail = []
+        self.__trail = self.__new_trail()
         self.distance = 0
 
         self.frame_index = 0
         self.explosion_sprite_index = 0
+        # Centerline height at the helicopter, as of the last collision check
+        self.last_center_y = self.get_center_y()
+
+    def get_state(self):
+        """Return a picklable snapshot of everything that evolves in a game."""
+        return {
+            "game_over": self.game_over,
+            "action": self.action,
+            **self.course.get_state(),
+            "helicopter_pos_y": self.helicopter_pos_y,
+            "helicopter_speed_y": self.helicopter_speed_y,
+            "trail": self.__trail_points(),
+            "distance": self.distance,
+            "frame_index": self.frame_index,
+            "explosion_sprite_index": self.explosion_sprite_index,
+        }
+
+    def set_state(self, state):
+        """Restore a snapshot taken with get_state."""
+        self.game_over = state["game_over"]
+        self.action = state["action"]
+        self.course.set_state(state)
+        self.helicopter_pos_y = state["helicopter_pos_y"]
+        self.helicopter_speed_y = state["helicopter_speed_y"]
+        self.__trail = self.__new_trail(y for _, y in state["trail"])
+        self.distance = state["distance"]
+        self.frame_index = state["frame_index"]
+        self.explosion_sprite_index = state["explosion_sprite_index"]
+        self.last_center_y = self.get_center_y()
+
+    @property
+    def seed(self):
+        return self.course.seed
+
+    @property
+    def tunnel(self):
+        return self.course.points
 
     def run(self):
         if self.render_mode == "human":
@@ -207,22 +425,107 @@ class HelicopterGame:
 
         self.__update_helicopter_pos()
 
-        self.__update_tunnel()
+        self.course.scroll()
 
         self.__check_collision()
 
         self.__update_trail()
 
-    def __check_collision(self):
-        center_y = None
-        for i in range(len(self.tunnel) - 1):
-            left = self.tunnel[i]
-            right = self.tunnel[i + 1]
-            if left.x <= self.HELICOPTER_POS_X <= right.x:
-                ratio = (self.HELICOPTER_POS_X - left.x) / (right.x - left.x)
-                center_y = left.y + (right.y - left.y) * ratio
+    def step_hold(self, action, max_frames):
+        """
+        Hold `action` for up to `max_frames` frames in one jump, stopping at
+        the first crash or when the helicopter reaches the next tunnel segment,
+        whichever comes first.
+
+        Under a held action the speed changes by a constant until it hits the
+        limit and the centerline is linear within a segment, so all frames are
+        computed at once with the same floating-point operations in the same
+        order as `step`; the result equals calling `step` frame by frame.
+        Returns the helicopter height, vertical speed and centerline height of
+        every frame advanced.
+        """
+        if self.game_over or max_frames <= 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+
+        speed_x = self.HELICOPTER_SPEED_X
+        x = self.HELICOPTER_POS_X
+        # The segment under the helicopter after the first frame and the
+        # number of frames until it scrolls past
+        points = self.course.points
+        for left, right in zip(points, points[1:]):
+            if left.x - speed_x <= x <= right.x - speed_x:
                 break
-        assert center_y is not None, "Center y should be found"
+        else:
+            raise AssertionError("Center y should be found")
+        frames = min(max_frames, int((right.x - speed_x - x) // speed_x) + 1)
+
+        speed = self.helicopter_speed_y
+        if action == 1:
+            if self.RESET_SPEED_ON_THRUST and speed > 0:
+                speed = 0
+            change = -self.THRUST
+        else:
+            change = self.GRAVITY
+        # Accumulating adds in sequence, like one addition per frame. The
+        # speed only moves one way, so once it reaches the limit it stays.
+        values = np.empty(frames + 1)
+        values.fill(change)
+        values[0] = speed
+        speed_y = np.add.accumulate(values)[1:]
+        if change > 0:
+            np.minimum(speed_y, self.HELICOPTER_SPEED_Y_MAX, out=speed_y)
+        else:
+            np.maximum(speed_y, -self.HELICOPTER_SPEED_Y_MAX, out=speed_y)
+        values[0] = self.helicopter_pos_y
+        values[1:] = speed_y
+        pos_y = np.add.accumulate(values)[1:]
+
+        # Positions are whole numbers, so x - left.x after k frames and the
+        # segment width are exact
+        ratio = (np.arange(frames) * speed_x + (x - left.x + speed_x)) / (
+            right.x - left.x
+        )
+        center_y = left.y + (right.y - left.y) * ratio
+
+        crashed = (
+            (pos_y < 0)
+            | (pos_y > self.HEIGHT)
+            | (
+                pos_y - self.HELICOPTER_WIDTH * 0.5
+                < center_y - self.TUNNEL_HEIGHT * 0.5
+            )
+            | (
+                pos_y + self.HELICOPTER_HEIGHT * 0.5
+                > center_y + self.TUNNEL_HEIGHT * 0.5
+            )
+        )
+        if crashed.any():
+            frames = int(crashed.argmax()) + 1
+            pos_y = pos_y[:frames]
+            speed_y = speed_y[:frames]
+            center_y = center_y[:frames]
+            self.game_over = True
+
+        self.action = action
+        self.frame_index += frames
+        self.distance += speed_x * frames
+        self.helicopter_pos_y = float(pos_y[-1])
+        # Clamp like __update_helicopter_pos, which keeps the limit's type
+        self.helicopter_speed_y = max(
+            -self.HELICOPTER_SPEED_Y_MAX,
+            min(self.HELICOPTER_SPEED_Y_MAX, float(speed_y[-1])),
+        )
+        self.course.scroll(frames)
+        self.last_center_y = float(center_y[-1])
+        self.__trail.extendleft(pos_y.tolist())
+        return pos_y, speed_y, center_y
+
+    def get_center_y(self):
+        """Return the tunnel centerline height at the helicopter's x position."""
+        return self.course.center_y(self.HELICOPTER_POS_X)
+
+    def __check_collision(self):
+        center_y = self.last_center_y = self.get_center_y()
         helicopter_top = self.helicopter_pos_y - self.HELICOPTER_WIDTH * 0.5
         helicopter_bottom = self.helicopter_pos_y + self.HELICOPTER_HEIGHT * 0.5
 
@@ -236,7 +539,9 @@ class HelicopterGame:
 
     def __draw_author(self):
         if self.show_debug_info:
-            author_text = self.info_font.render("By Ross Ning", True, (255, 255, 255))
+            author_text = self.__render_static(
+                self.info_font, "By Ross Ning", True, (255, 255, 255)
+            )
             self.surface.blit(
                 author_text,
                 (
@@ -276,8 +581,11 @@ class HelicopterGame:
             0, 0, self.WIDTH // 2, distance_text_rect.height + 6
         )
         bulletin_rect.center = distance_text_rect.center
-        overlay = pygame.Surface(bulletin_rect.size, pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 160))
+        overlay = self.__distance_overlay
+        if overlay is None or overlay.get_size() != bulletin_rect.size:
+            overlay = pygame.Surface(bulletin_rect.size, pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 160))
+            self.__distance_overlay = overlay
         self.surface.blit(overlay, overlay.get_rect(center=bulletin_rect.center))
         self.surface.blit(distance_text, distance_text_rect)
 
@@ -296,7 +604,7 @@ class HelicopterGame:
 
     def __draw_game_over(self):
         if self.game_over:
-            text = self.font.render("Game Over", False, (255, 0, 0))
+            text = self.__render_static(self.font, "Game Over", False, (255, 0, 0))
             rect = text.get_rect(center=(self.WIDTH // 2, self.HEIGHT // 2))
             self.surface.blit(text, rect)
 
@@ -365,7 +673,9 @@ class HelicopterGame:
 
     def __draw_trail(self):
         if len(self.__trail) > 1:
-            pygame.draw.lines(self.surface, (255, 0, 0), False, self.__trail, 1)
+            pygame.draw.lines(
+                self.surface, (255, 0, 0), False, self.__trail_points(), 1
+            )
 
     def __draw_speed_indicator(self):
         indicator_scale = 10
@@ -405,6 +715,12 @@ class HelicopterGame:
         keys = pygame.key.get_pressed()
         self.action = 1 if keys[pygame.K_SPACE] else 0
 
+    def __render_static(self, font, text, antialias, color):
+        key = (id(font), text, antialias, color)
+        if key not in self.__static_text:
+            self.__static_text[key] = font.render(text, antialias, color)
+        return self.__static_text[key]
+
     def __update_helicopter_pos(self):
         if self.action == 1:
             if self.RESET_SPEED_ON_THRUST and self.helicopter_speed_y > 0:
@@ -419,29 +735,20 @@ class HelicopterGame:
 
         self.helicopter_pos_y += self.helicopter_speed_y
 
-    def __update_tunnel(self):
-        for pt in self.tunnel:
-            pt.x -= self.HELICOPTER_SPEED_X
-
-        while self.tunnel[-1].x < self.WIDTH:
-            self.tunnel.append(
-                pygame.Vector2(
-                    self.tunnel[-1].x
-                    + random.randint(self.TUNNEL_SEGMENT_MIN, self.TUNNEL_SEGMENT_MAX),
-                    self.HEIGHT * 0.5
-                    + random.randint(
-                        -self.TUNNEL_CENTER_OFFSET_MAX, self.TUNNEL_CENTER_OFFSET_MAX
-                    ),
-                )
-            )
-        while self.tunnel[1].x < 0:
-            self.tunnel.pop(0)
+    def __new_trail(self, ys=()):
+        # The trail scrolls with the tunnel, so only the heights are stored,
+        # newest first; a point leaves the screen after this many frames
+        length = int(self.HELICOPTER_POS_X // self.HELICOPTER_SPEED_X) + 1
+        return deque(ys, maxlen=length)
+
+    def __trail_points(self):
+        return [
+            (self.HELICOPTER_POS_X - index * self.HELICOPTER_SPEED_X, y)
+            for index, y in enumerate(self.__trail)
+        ]
 
     def __update_trail(self):
-        for i, (x, y) in enumerate(self.__trail):
-            self.__trail[i] = (x - self.HELICOPTER_SPEED_X, y)
-        self.__trail.insert(0, (self.HELICOPTER_POS_X, self.helicopter_pos_y))
-        self.__trail = [p for p in self.__trail if p[0] >= 0]
+        self.__trail.appendleft(self.helicopter_pos_y)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+import numpy as np
+from helicopter_game import HelicopterGame
+
+# Weight of each reward term per reward mode. The total reward is the weighted
+# sum of the terms; terms with no weight in a mode are not computed.
+REWARD_MODES = {
+    "survival": {"survival": 1.0},
+    "centerline": {"survival": 1.0, "centerline": 0.5},
+    "velocity": {"survival": 1.0, "velocity": 0.5},
+    "crash": {"survival": 1.0, "crash": 100.0},
+}
+
+
+def _survival(pos_y, speed_y, center_y, game_over):
+    return np.where(game_over, 0.0, 1.0)
+
+
+def _centerline(pos_y, speed_y, center_y, game_over):
+    # 0 on the centerline, -1 at (or beyond) the tunnel walls
+    offset = np.abs(pos_y - center_y) / (HelicopterGame.TUNNEL_HEIGHT * 0.5)
+    return np.where(game_over, 0.0, -np.minimum(offset, 1.0))
+
+
+def _velocity(pos_y, speed_y, center_y, game_over):
+    speed = speed_y / HelicopterGame.HELICOPTER_SPEED_Y_MAX
+    return np.where(game_over, 0.0, -(speed * speed))
+
+
+def _crash(pos_y, speed_y, center_y, game_over):
+    return np.where(game_over, -1.0, 0.0)
+
+
+REWARD_TERMS = {
+    "survival": _survival,
+    "centerline": _centerline,
+    "velocity": _velocity,
+    "crash": _crash,
+}
+
+
+# The same terms for one game state as plain floats. A single env steps
+# too fast for the array overhead of compute_reward.
+def _survival_scalar(pos_y, speed_y, center_y, game_over):
+    return 0.0 if game_over else 1.0
+
+
+def _centerline_scalar(pos_y, speed_y, center_y, game_over):
+    offset = abs(pos_y - center_y) / (HelicopterGame.TUNNEL_HEIGHT * 0.5)
+    return 0.0 if game_over else -min(offset, 1.0)
+
+
+def _velocity_scalar(pos_y, speed_y, center_y, game_over):
+    speed = speed_y / HelicopterGame.HELICOPTER_SPEED_Y_MAX
+    return 0.0 if game_over else -(speed * speed)
+
+
+def _crash_scalar(pos_y, speed_y, center_y, game_over):
+    return -1.0 if game_over else 0.0
+
+
+SCALAR_REWARD_TERMS = {
+    "survival": _survival_scalar,
+    "centerline": _centerline_scalar,
+    "velocity": _velocity_scalar,
+    "crash": _crash_scalar,
+}
+
+
+def compute_step_reward(mode, pos_y, speed_y, center_y, game_over):
+    """
+    Compute the reward for one game state, as floats equal to the single
+    entry compute_reward returns for it.
+    """
+    terms = {
+        name: weight * SCALAR_REWARD_TERMS[name](pos_y, speed_y, center_y, game_over)
+        for name, weight in REWARD_MODES[mode].items()
+    }
+    total = 0.0
+    for value in terms.values():
+        total += value
+    return total, terms
+
+
+def compute_reward(mode, pos_y, speed_y, center_y, game_over):
+    """
+    Compute the reward for a batch of game states.
+
+    All state arguments are arrays of the same shape (one entry per env, or
+    per frame). Returns the total reward and a dict with the weighted
+    contribution of every term of the mode, so each can be logged on its own.
+    """
+    pos_y = np.asarray(pos_y, dtype=np.float64)
+    speed_y = np.asarray(speed_y, dtype=np.float64)
+    center_y = np.asarray(center_y, dtype=np.float64)
+    game_over = np.asarray(game_over, dtype=bool)
+
+    terms = {
+        name: weight * REWARD_TERMS[name](pos_y, speed_y, center_y, game_over)
+        for name, weight in REWARD_MODES[mode].items()
+    }
+    total = np.zeros(game_over.shape, dtype=np.float64)
+    for value in terms.values():
+        total += value
+    return total, terms
@@ -0,0 +1,268 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from helicopter_game import HelicopterGame
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+# Histogram buckets (upper bounds) for latencies in seconds
+LATENCY_BUCKETS = (1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0)
+# Histogram buckets for episode lengths in frames
+LENGTH_BUCKETS = (10, 30, 100, 300, 1000, 3000, 10_000, 30_000, 100_000)
+
+
+def _format_value(value):
+    if value == np.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    A Prometheus metric family with an optional label per value.
+
+    Values live in a NumPy array that only the training thread writes; the
+    server thread reads it without locking. A scrape may see one update of a
+    family and not yet the next, which Prometheus tolerates.
+    """
+
+    def __init__(self, name, kind, help, label=None, size=1):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.label = label
+        self.values = np.zeros(size, dtype=np.float64)
+
+    def _labels(self, index, extra=""):
+        labels = [f'{self.label}="{index}"'] if self.label else []
+        if extra:
+            labels.append(extra)
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for index, value in enumerate(self.values):
+            lines.append(f"{self.name}{self._labels(index)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    def __init__(self, name, help, buckets):
+        super().__init__(name, "histogram", help)
+        self.buckets = np.append(np.asarray(buckets, dtype=np.float64), np.inf)
+        self.counts = np.zeros(len(self.buckets), dtype=np.int64)
+        self.sum = 0.0
+
+    def observe(self, values):
+        """Add one value or an array of values."""
+        values = np.atleast_1d(values)
+        np.add.at(self.counts, np.searchsorted(self.buckets, values), 1)
+        self.sum += float(values.sum())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = np.cumsum(self.counts)
+        for bound, count in zip(self.buckets, cumulative):
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{self._labels(0, le)} {count}")
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {cumulative[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, prefix="helicopter_"):
+        self.prefix = prefix
+        self.metrics = {}
+
+    def __add(self, metric):
+        assert metric.name not in self.metrics, f"Duplicate metric {metric.name}"
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, label=None, size=1):
+        return self.__add(Metric(self.prefix + name, "counter", help, label, size))
+
+    def gauge(self, name, help, label=None, size=1):
+        return self.__add(Metric(self.prefix + name, "gauge", help, label, size))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        return self.__add(Histogram(self.prefix + name, help, buckets))
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve a registry in the Prometheus text format on /metrics."""
+
+    def __init__(self, registry, port=9100, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.address = self.server.server_address
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class VecEnvMetrics(VecEnvWrapper):
+    """
+    Count env steps and finished episodes of a VecEnv into a registry.
+
+    Per env it exports the frames of the running episode, so an env that stops
+    finishing episodes shows up, and the time of the last step, so a stalled
+    worker stops advancing it.
+    """
+
+    def __init__(self, venv, registry):
+        super().__init__(venv)
+        n = self.num_envs
+        self.steps = registry.counter("env_steps_total", "Env steps over all envs")
+        self.step_seconds = registry.counter(
+            "env_step_seconds_total", "Wall time spent stepping the envs"
+        )
+        self.step_latency = registry.histogram(
+            "env_step_seconds", "Wall time of one vectorized env step"
+        )
+        self.last_step = registry.gauge(
+            "env_last_step_timestamp_seconds", "Unix time of the last env step"
+        )
+        self.episodes = registry.counter(
+            "episodes_total", "Finished episodes per env", "env", n
+        )
+        self.crashes = registry.counter(
+            "crashes_total", "Episodes ended by a crash per env", "env", n
+        )
+        self.episode_frames = registry.gauge(
+            "episode_frames", "Frames of the running episode per env", "env", n
+        )
+        self.episode_length = registry.histogram(
+            "episode_length_frames", "Length of finished episodes", LENGTH_BUCKETS
+        )
+        self.episode_distance = registry.histogram(
+            "episode_distance",
+            "Distance flown in finished episodes",
+            np.asarray(LENGTH_BUCKETS) * HelicopterGame.HELICOPTER_SPEED_X,
+        )
+        self.__step_start = None
+
+    def reset(self):
+        self.episode_frames.values[:] = 0
+        return self.venv.reset()
+
+    def step_async(self, actions):
+        self.__step_start = time.perf_counter()
+        self.venv.step_async(actions)
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        elapsed = time.perf_counter() - self.__step_start
+        self.step_seconds.values[0] += elapsed
+        self.step_latency.observe(elapsed)
+        self.steps.values[0] += self.num_envs
+        self.last_step.values[0] = time.time()
+
+        frames = self.episode_frames.values
+        frames += 1
+        done = np.flatnonzero(dones)
+        if len(done):
+            self.episode_length.observe(frames[done])
+            self.episode_distance.observe(
+                [infos[i].get("distance", 0) for i in done]
+            )
+            self.episodes.values[done] += 1
+            for i in done:
+                if not infos[i].get("TimeLimit.truncated", False):
+                    self.crashes.values[i] += 1
+            frames[done] = 0
+        return obs, rewards, dones, infos
+
+
+class MetricsCallback(BaseCallback):
+    """
+    Time rollouts, updates and policy forward passes of an on-policy model.
+
+    Inference latency is measured with forward hooks on the policy, which fire
+    for the forward passes of rollout collection but not for the batched
+    evaluation during updates.
+    """
+
+    def __init__(self, registry):
+        super().__init__()
+        self.rollout_seconds = registry.counter(
+            "rollout_seconds_total", "Wall time spent collecting rollouts"
+        )
+        self.update_seconds = registry.counter(
+            "update_seconds_total", "Wall time spent in policy updates"
+        )
+        self.steps_per_second = registry.gauge(
+            "env_steps_per_second", "Env steps per second of the last rollout"
+        )
+        self.timesteps = registry.gauge("timesteps", "Timesteps trained on")
+        self.inference = registry.histogram(
+            "policy_inference_seconds", "Latency of one batched policy forward pass"
+        )
+        self.__rollout_start = None
+        self.__rollout_end = None
+        self.__rollout_steps = 0
+        self.__forward_start = 0.0
+        self.__hooks = []
+
+    def _on_training_start(self):
+        def pre_hook(module, args):
+            self.__forward_start = time.perf_counter()
+
+        def hook(module, args, output):
+            self.inference.observe(time.perf_counter() - self.__forward_start)
+
+        policy = self.model.policy
+        self.__hooks = [
+            policy.register_forward_pre_hook(pre_hook),
+            policy.register_forward_hook(hook),
+        ]
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self.__rollout_end is not None:
+            self.update_seconds.values[0] += now - self.__rollout_end
+        self.__rollout_start = now
+        self.__rollout_steps = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        elapsed = now - self.__rollout_start
+        self.rollout_seconds.values[0] += elapsed
+        self.steps_per_second.values[0] = (
+            self.num_timesteps - self.__rollout_steps
+        ) / max(elapsed, 1e-9)
+        self.timesteps.values[0] = self.num_timesteps
+        self.__rollout_end = now
+
+    def _on_training_end(self):
+        for handle in self.__hooks:
+            handle.remove()
+        self.__hooks = []
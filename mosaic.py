@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+from helicopter_game import HelicopterGame, get_helicopter_sprite
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.logger import Image
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+BACKGROUND_COLOR = (58, 0, 109)
+TUNNEL_COLOR = (148, 115, 24)
+CRASH_COLOR = (255, 0, 0)
+GRID_COLOR = (0, 0, 0)
+
+
+class MosaicRenderer:
+    """
+    Draw a minimal view of many games (tunnel walls, helicopter and a crash
+    marker) as tiles of one preallocated canvas.
+
+    Every tile is a subsurface of the canvas, so drawing allocates no
+    surfaces, and all tiles share one scaled copy of the helicopter sprite.
+    Scenes are the tuples returned by HelicopterEnv.get_scene.
+    """
+
+    def __init__(self, n_tiles, scale=0.25, columns=None, config=HelicopterGame):
+        import pygame
+
+        self.config = config
+        self.scale = scale
+        self.columns = columns or math.ceil(math.sqrt(n_tiles))
+        self.rows = math.ceil(n_tiles / self.columns)
+        # One pixel of grid line right and below every tile
+        self.tile_size = (
+            max(1, round(config.WIDTH * scale)),
+            max(1, round(config.HEIGHT * scale)),
+        )
+        width, height = self.tile_size
+        self.canvas = pygame.Surface(
+            (self.columns * (width + 1), self.rows * (height + 1))
+        )
+        self.canvas.fill(GRID_COLOR)
+        self.tiles = [
+            self.canvas.subsurface(
+                (
+                    index % self.columns * (width + 1),
+                    index // self.columns * (height + 1),
+                    width,
+                    height,
+                )
+            )
+            for index in range(n_tiles)
+        ]
+        self.helicopter_frames = get_helicopter_sprite().get_frames(scale)
+        self.frame = np.zeros(
+            (self.canvas.get_height(), self.canvas.get_width(), 3), dtype=np.uint8
+        )
+
+    def draw(self, scenes):
+        """Draw one scene per tile and return the canvas as an HxWx3 array."""
+        import pygame
+
+        config = self.config
+        scale = self.scale
+        width, height = self.tile_size
+        half_tunnel = config.TUNNEL_HEIGHT * 0.5
+        helicopter_x = round(config.HELICOPTER_POS_X * scale)
+        for tile, (points, pos_y, speed_y, game_over, frame_index) in zip(
+            self.tiles, scenes
+        ):
+            tile.fill(BACKGROUND_COLOR)
+            top = [(x * scale, (y - half_tunnel) * scale) for x, y in points]
+            bottom = [(x * scale, (y + half_tunnel) * scale) for x, y in points]
+            pygame.draw.polygon(tile, TUNNEL_COLOR, top + [(width, 0), (0, 0)])
+            pygame.draw.polygon(
+                tile, TUNNEL_COLOR, bottom + [(width, height), (0, height)]
+            )
+
+            y = round(pos_y * scale)
+            if game_over:
+                size = max(2, round(8 * scale))
+                pygame.draw.line(
+                    tile,
+                    CRASH_COLOR,
+                    (helicopter_x - size, y - size),
+                    (helicopter_x + size, y + size),
+                )
+                pygame.draw.line(
+                    tile,
+                    CRASH_COLOR,
+                    (helicopter_x - size, y + size),
+                    (helicopter_x + size, y - size),
+                )
+            else:
+                frame = self.helicopter_frames[
+                    frame_index // 2 % 2 if speed_y < 0 else 2 + frame_index % 2
+                ]
+                tile.blit(frame, frame.get_rect(center=(helicopter_x, y)))
+
+        pixels = pygame.surfarray.pixels3d(self.canvas)
+        np.copyto(self.frame, pixels.transpose(1, 0, 2))
+        del pixels  # Unlock the canvas
+        return self.frame
+
+
+class VecMosaic(VecEnvWrapper):
+    """
+    Add a "mosaic" render mode that draws all envs into one MosaicRenderer
+    canvas. Other render modes are passed on to the wrapped VecEnv.
+
+    Envs start their next episode on the step they crash, before they can be
+    drawn, so the crash marker is drawn where the helicopter crashed (the
+    "pos_y" of the terminal info) for the next `crash_steps` steps instead.
+    """
+
+    def __init__(self, venv, scale=0.25, columns=None, crash_steps=30):
+        super().__init__(venv)
+        self.mosaic_scale = scale
+        self.mosaic_columns = columns
+        self.crash_steps = crash_steps
+        self.renderer = None
+        # Steps left to show each env's crash marker, and its height
+        self.crash_countdown = np.zeros(self.num_envs, dtype=np.int64)
+        self.crash_y = np.zeros(self.num_envs, dtype=np.float64)
+
+    def reset(self):
+        self.crash_countdown[:] = 0
+        return self.venv.reset()
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        np.maximum(self.crash_countdown - 1, 0, out=self.crash_countdown)
+        for i in np.flatnonzero(dones).tolist():
+            if infos[i].get("game_over") and "pos_y" in infos[i]:
+                self.crash_countdown[i] = self.crash_steps
+                self.crash_y[i] = infos[i]["pos_y"]
+        return obs, rewards, dones, infos
+
+    def render(self, mode=None):
+        if mode != "mosaic":
+            return self.venv.render(mode=mode)
+        if self.renderer is None:
+            self.renderer = MosaicRenderer(
+                self.num_envs, self.mosaic_scale, self.mosaic_columns
+            )
+        scenes = self.venv.env_method("get_scene")
+        for i in np.flatnonzero(self.crash_countdown).tolist():
+            points, _, speed_y, _, frame_index = scenes[i]
+            scenes[i] = (points, float(self.crash_y[i]), speed_y, True, frame_index)
+        return self.renderer.draw(scenes)
+
+
+class MosaicCallback(BaseCallback):
+    """Log a mosaic of all training envs to TensorBoard every `render_freq` steps."""
+
+    def __init__(self, render_freq):
+        super().__init__()
+        self.render_freq = render_freq
+
+    def _on_step(self) -> bool:
+        if self.n_calls % self.render_freq == 0:
+            frame = self.training_env.render(mode="mosaic")
+            self.logger.record(
+                "monitor/mosaic",
+                Image(frame, "HWC"),
+                exclude=("stdout", "log", "json", "csv"),
+            )
+        return True
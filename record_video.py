@@ -1,6 +1,4 @@
-import imageio
 import numpy as np
-from stable_baselines3 import PPO
 from helicopter_env import HelicopterEnv
 
 
@@ -83,6 +81,9 @@ def record_video(
     fps=60,
     max_steps=30000,
 ):
+    import imageio
+    from stable_baselines3 import PPO
+
     print(f"Loading model: {model_path}")
     model = PPO.load(model_path)
 
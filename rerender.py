@@ -0,0 +1,144 @@
+import argparse
+import math
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from episode_log import EpisodeLog
+
+
+def take_snapshots(log, chunk_size):
+    """Replay a log headlessly and snapshot the game at every chunk start."""
+    game = log.make_game()
+    snapshots = []
+    for index, action in enumerate(log.actions):
+        if index % chunk_size == 0:
+            snapshots.append(game.get_state())
+        game.action = int(action)
+        game.step()
+    return snapshots
+
+
+def render_chunk(log, snapshot, start, end, tail_frames, out_path, fps):
+    """Render the frames after actions [start, end) into a video segment."""
+    import pygame
+    from eval import VideoWriter
+
+    game = log.make_game(render_mode="rgb_array")
+    game.set_state(snapshot)
+    writer = VideoWriter(out_path, fps=fps)
+
+    def write_frame():
+        game.draw()
+        writer.write(pygame.surfarray.array3d(game.surface).transpose(1, 0, 2))
+
+    for action in log.actions[start:end]:
+        game.action = int(action)
+        game.step()
+        write_frame()
+    # Let the explosion play out after the final crash
+    for _ in range(tail_frames):
+        game.step()
+        write_frame()
+    writer.close()
+    return out_path
+
+
+def concat_segments(segment_paths, out_path):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+        list_path = f.name
+    try:
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                list_path,
+                "-c",
+                "copy",
+                out_path,
+            ],
+            check=True,
+        )
+    finally:
+        os.remove(list_path)
+
+
+def rerender(log_path, out_video, workers=None, n_chunks=None, fps=60, tail=30):
+    log = EpisodeLog.load(log_path)
+    if len(log) == 0:
+        raise ValueError(f"{log_path} contains no actions")
+    workers = workers or os.cpu_count() or 1
+    n_chunks = min(n_chunks or workers, len(log))
+    chunk_size = math.ceil(len(log) / n_chunks)
+    snapshots = take_snapshots(log, chunk_size)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for index, snapshot in enumerate(snapshots):
+                start = index * chunk_size
+                end = min(start + chunk_size, len(log))
+                futures.append(
+                    executor.submit(
+                        render_chunk,
+                        log,
+                        snapshot,
+                        start,
+                        end,
+                        tail if end == len(log) else 0,
+                        os.path.join(tmp_dir, f"segment_{index:04d}.mp4"),
+                        fps,
+                    )
+                )
+            segments = [future.result() for future in futures]
+        concat_segments(segments, out_video)
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log", type=str, help="Episode log written by eval.py")
+    parser.add_argument("--out-video", type=str, required=True)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of render processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--chunks",
+        type=int,
+        help="Number of segments to split the episode into (default: workers)",
+    )
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument(
+        "--tail",
+        type=int,
+        default=30,
+        help="Frames rendered after the last action to show the explosion",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rerender(
+        args.log,
+        args.out_video,
+        workers=args.workers,
+        n_chunks=args.chunks,
+        fps=args.fps,
+        tail=args.tail,
+    )
+    print(f"Rendered {args.out_video} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    _main()
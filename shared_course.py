@@ -0,0 +1,278 @@
+import numpy as np
+from gymnasium import spaces
+from helicopter_env import HelicopterEnv
+from helicopter_game import HelicopterGame, Tunnel
+from helicopter_reward import REWARD_MODES, compute_reward
+from stable_baselines3.common.vec_env import VecEnv
+
+
+def update_helicopters(config, pos_y, speed_y, alive, actions):
+    """
+    Apply one frame of thrust or gravity to the live helicopters in place,
+    exactly as HelicopterGame does for one.
+    """
+    thrust = (np.asarray(actions) == 1) & alive
+    fall = ~thrust & alive
+    if config.RESET_SPEED_ON_THRUST:
+        speed_y[thrust & (speed_y > 0)] = 0
+    speed_y[thrust] -= config.THRUST
+    speed_y[fall] += config.GRAVITY
+    speed_y[alive] = np.clip(
+        speed_y[alive],
+        -config.HELICOPTER_SPEED_Y_MAX,
+        config.HELICOPTER_SPEED_Y_MAX,
+    )
+    pos_y[alive] += speed_y[alive]
+
+
+def check_crashes(config, pos_y, center_y):
+    """Return which helicopters are off screen or touch the tunnel walls."""
+    helicopter_top = pos_y - config.HELICOPTER_WIDTH * 0.5
+    helicopter_bottom = pos_y + config.HELICOPTER_HEIGHT * 0.5
+    return (
+        (pos_y < 0)
+        | (pos_y > config.HEIGHT)
+        | (helicopter_top < center_y - config.TUNNEL_HEIGHT * 0.5)
+        | (helicopter_bottom > center_y + config.TUNNEL_HEIGHT * 0.5)
+    )
+
+
+class SharedCourseGame:
+    """
+    Many helicopters flying through one tunnel.
+
+    The tunnel is generated, scrolled and interpolated once per step; only the
+    per-helicopter position, speed and alive arrays are updated per agent.
+    Crashed helicopters are masked out and stay where they crashed. Each agent
+    follows exactly the trajectory a HelicopterGame on the same seed would.
+    """
+
+    def __init__(self, n_agents, config=HelicopterGame):
+        self.n_agents = n_agents
+        self.config = config
+        self.course = Tunnel(config)
+        self.reset()
+
+    def reset(self, seed=None):
+        self.course.reset(seed)
+        self.frame_index = 0
+        self.pos_y = np.full(self.n_agents, self.config.HEIGHT / 2, dtype=np.float64)
+        self.speed_y = np.zeros(self.n_agents, dtype=np.float64)
+        self.alive = np.ones(self.n_agents, dtype=bool)
+        self.distance = np.zeros(self.n_agents, dtype=np.int64)
+
+    @property
+    def seed(self):
+        return self.course.seed
+
+    @property
+    def game_over(self):
+        return not self.alive.any()
+
+    def center_y(self):
+        return self.course.center_y(self.config.HELICOPTER_POS_X)
+
+    def step(self, actions):
+        """Advance all live helicopters one frame; return the agents that crashed."""
+        config = self.config
+        alive = self.alive
+        self.frame_index += 1
+        self.distance[alive] += config.HELICOPTER_SPEED_X
+        update_helicopters(config, self.pos_y, self.speed_y, alive, actions)
+
+        self.course.scroll()
+
+        crashed = alive & check_crashes(config, self.pos_y, self.center_y())
+        self.alive &= ~crashed
+        return crashed
+
+    def observations(self):
+        """Observations of all agents, laid out as in HelicopterEnv."""
+        config = self.config
+        obs = np.empty(
+            (self.n_agents, 2 + HelicopterEnv.MAX_TUNNEL_STEPS * 2), dtype=np.float32
+        )
+        obs[:, 0] = self.pos_y / config.HEIGHT
+        obs[:, 1] = self.speed_y / config.HELICOPTER_SPEED_Y_MAX * 0.5 + 0.5
+
+        tunnel = np.full(
+            (HelicopterEnv.MAX_TUNNEL_STEPS, 2), [1.0, 0.5], dtype=np.float32
+        )
+        points = self.course.points[: HelicopterEnv.MAX_TUNNEL_STEPS]
+        for index, t in enumerate(points):
+            tunnel[index] = (
+                (t.x + config.WIDTH) / (config.WIDTH * 3),
+                t.y / config.HEIGHT,
+            )
+        obs[:, 2:] = tunnel.ravel()
+        return obs
+
+
+class ArrayVecEnv(VecEnv):
+    """
+    Base of the VecEnvs that simulate all their envs in one array-backed game
+    instead of one HelicopterEnv each.
+
+    Envs are not separate objects: attributes are shared by all of them, and
+    the only per-env methods are those in ENV_METHODS, implemented by the
+    subclass with the env index as first argument. Nothing is drawn per env,
+    so `get_images` returns None for every env (as DummyVecEnv does without
+    render mode "rgb_array"); use mosaic.VecMosaic to watch them.
+    """
+
+    ENV_METHODS = ("get_scene",)
+
+    def __init__(self, n_envs, reward_mode="survival"):
+        if reward_mode not in REWARD_MODES:
+            raise ValueError(
+                f"Unknown reward mode {reward_mode!r}, "
+                f"expected one of {sorted(REWARD_MODES)}"
+            )
+        self.reward_mode = reward_mode
+        self.actions = np.zeros(n_envs, dtype=np.int64)
+        self.render_mode = None
+        super().__init__(
+            n_envs,
+            spaces.Box(
+                low=0.0,
+                high=1.0,
+                shape=(2 + HelicopterEnv.MAX_TUNNEL_STEPS * 2,),
+                dtype=np.float32,
+            ),
+            spaces.Discrete(2),
+        )
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions).reshape(self.num_envs)
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name not in self.ENV_METHODS:
+            raise AttributeError(
+                f"{type(self).__name__} has no per-env method {method_name!r}"
+            )
+        method = getattr(self, method_name)
+        return [
+            method(index, *method_args, **method_kwargs)
+            for index in self._get_indices(indices)
+        ]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    def get_images(self):
+        return [None for _ in range(self.num_envs)]
+
+
+class SharedCourseVecEnv(ArrayVecEnv):
+    """
+    VecEnv over a SharedCourseGame: every env index is one helicopter in the
+    same tunnel.
+
+    An agent reports done on the step it crashes; after that its slot is masked
+    (reward 0, done False, info["masked"] True) until every agent has crashed
+    or `max_frames` is reached, when a new course is started for all of them.
+    This makes it suited to evaluation and population comparisons on identical
+    courses rather than to single-policy training.
+    """
+
+    def __init__(self, n_envs, reward_mode="survival", max_frames=None, seed=None):
+        self.game = SharedCourseGame(n_envs)
+        self.max_frames = max_frames
+        self.rng = np.random.default_rng(seed)
+        super().__init__(n_envs, reward_mode)
+
+    def __new_course(self):
+        seed = self._seeds[0] if self._seeds and self._seeds[0] is not None else None
+        if seed is None:
+            seed = int(self.rng.integers(2**32))
+        self._reset_seeds()
+        self.game.reset(seed=seed)
+
+    def reset(self):
+        self.__new_course()
+        return self.game.observations()
+
+    def get_scene(self, index):
+        """Return agent `index` in the shared tunnel, as HelicopterEnv.get_scene."""
+        game = self.game
+        return (
+            [(t.x, t.y) for t in game.course.points],
+            float(game.pos_y[index]),
+            float(game.speed_y[index]),
+            not bool(game.alive[index]),
+            game.frame_index,
+        )
+
+    def step_wait(self):
+        game = self.game
+        was_alive = game.alive.copy()
+        crashed = game.step(self.actions)
+
+        total, terms = compute_reward(
+            self.reward_mode,
+            game.pos_y,
+            game.speed_y,
+            np.full(self.num_envs, game.center_y()),
+            crashed,
+        )
+        rewards = np.where(was_alive, total, 0.0).astype(np.float32)
+        terms = {name: np.where(was_alive, value, 0.0) for name, value in terms.items()}
+        dones = crashed.copy()
+        obs = game.observations()
+        infos = [
+            {
+                "game_over": bool(not game.alive[i]),
+                "course_seed": game.seed,
+                "pos_y": float(game.pos_y[i]),
+                "masked": bool(not was_alive[i]),
+                "reward_terms": {
+                    name: float(value[i]) for name, value in terms.items()
+                },
+            }
+            for i in range(self.num_envs)
+        ]
+        for i in np.flatnonzero(crashed):
+            infos[i]["terminal_observation"] = obs[i]
+
+        truncated = (
+            self.max_frames is not None and game.frame_index >= self.max_frames
+        )
+        if truncated:
+            for i in np.flatnonzero(game.alive):
+                dones[i] = True
+                infos[i]["terminal_observation"] = obs[i]
+                infos[i]["TimeLimit.truncated"] = True
+        if game.game_over or truncated:
+            self.__new_course()
+            obs = game.observations()
+        return obs, rewards, dones, infos
+
+
+def compare_policies(policies, seeds, max_frames=30_000, deterministic=True):
+    """
+    Fly each policy (an SB3 model) through the same courses, one helicopter per
+    policy, and return the flying distance of every policy on every seed as an
+    array of shape (len(policies), len(seeds)).
+    """
+    game = SharedCourseGame(len(policies))
+    distances = np.zeros((len(policies), len(seeds)), dtype=np.int64)
+    actions = np.zeros(len(policies), dtype=np.int64)
+    for j, seed in enumerate(seeds):
+        game.reset(seed=seed)
+        while not game.game_over and game.frame_index < max_frames:
+            obs = game.observations()
+            for i in np.flatnonzero(game.alive):
+                action, _ = policies[i].predict(obs[i], deterministic=deterministic)
+                actions[i] = int(action)
+            game.step(actions)
+        distances[:, j] = game.distance
+    return distances
@@ -0,0 +1,335 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from helicopter_reward import REWARD_MODES
+
+# Values sampled for each PPO hyperparameter. Tuples are log-uniform ranges,
+# lists are discrete choices.
+SEARCH_SPACE = {
+    "learning_rate": (1e-5, 1e-3),
+    "n_steps": [256, 512, 1024, 2048],
+    "batch_size": [64, 128, 256, 512],
+    "n_epochs": [3, 5, 10],
+    "gamma": [0.99, 0.995, 0.999],
+    "gae_lambda": [0.9, 0.95, 0.98],
+    "clip_range": [0.1, 0.2, 0.3],
+    "ent_coef": (1e-8, 1e-2),
+}
+
+
+def sample_hyperparams(rng):
+    params = {}
+    for name, space in SEARCH_SPACE.items():
+        if isinstance(space, tuple):
+            low, high = space
+            params[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            params[name] = rng.choice(space)
+    return params
+
+
+class SweepStore:
+    """SQLite store for trial parameters, intermediate rewards and results."""
+
+    def __init__(self, path):
+        self.path = path
+        # Trials write concurrently from several processes
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS trials (
+                id INTEGER PRIMARY KEY,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                timesteps INTEGER,
+                best_reward REAL,
+                final_reward REAL,
+                started REAL,
+                finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS reports (
+                trial_id INTEGER NOT NULL,
+                step INTEGER NOT NULL,
+                reward REAL NOT NULL,
+                PRIMARY KEY (trial_id, step)
+            );
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def add_trial(self, trial_id, params):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO trials (id, params, status) "
+                "VALUES (?, ?, 'pending')",
+                (trial_id, json.dumps(params)),
+            )
+
+    def start_trial(self, trial_id):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE trials SET status = 'running', started = ? WHERE id = ?",
+                (time.time(), trial_id),
+            )
+
+    def finish_trial(self, trial_id, status, timesteps, best_reward, final_reward):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE trials SET status = ?, timesteps = ?, best_reward = ?, "
+                "final_reward = ?, finished = ? WHERE id = ?",
+                (status, timesteps, best_reward, final_reward, time.time(), trial_id),
+            )
+
+    def report(self, trial_id, step, reward):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reports (trial_id, step, reward) "
+                "VALUES (?, ?, ?)",
+                (trial_id, step, reward),
+            )
+
+    def rewards_at(self, step, exclude_trial_id):
+        rows = self.conn.execute(
+            "SELECT reward FROM reports WHERE step = ? AND trial_id != ?",
+            (step, exclude_trial_id),
+        )
+        return [reward for (reward,) in rows]
+
+    def results(self):
+        rows = self.conn.execute(
+            "SELECT id, params, status, timesteps, best_reward, final_reward, "
+            "started, finished FROM trials ORDER BY id"
+        )
+        return [
+            {
+                "id": trial_id,
+                "params": json.loads(params),
+                "status": status,
+                "timesteps": timesteps,
+                "best_reward": best_reward,
+                "final_reward": final_reward,
+                "duration": finished - started if started and finished else None,
+            }
+            for (
+                trial_id,
+                params,
+                status,
+                timesteps,
+                best_reward,
+                final_reward,
+                started,
+                finished,
+            ) in rows
+        ]
+
+
+def _init_worker(core_queue, threads):
+    cores = core_queue.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    # Keep BLAS/OpenMP pools inside the trial's CPU budget
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[name] = str(threads)
+
+
+def run_trial(trial_id, params, config):
+    import torch
+    from callbacks import EarlyStoppingCallback
+    from train import make_env, make_model
+
+    torch.set_num_threads(config["threads"])
+
+    log_dir = os.path.join(config["out_dir"], f"trial_{trial_id:04d}")
+    store = SweepStore(config["store"])
+    store.start_trial(trial_id)
+    try:
+        vec_env = make_env(
+            config["n_envs"], log_dir, reward_mode=config["reward_mode"]
+        )
+        model = make_model(vec_env, log_dir, verbose=0, seed=trial_id, **params)
+        callback = EarlyStoppingCallback(
+            store,
+            trial_id,
+            log_dir,
+            eval_freq=config["eval_freq"],
+            window=config["window"],
+            warmup=config["warmup"],
+            min_trials=config["min_trials"],
+            patience=config["patience"],
+        )
+        model.learn(
+            total_timesteps=config["timesteps"],
+            callback=callback,
+            tb_log_name=f"trial_{trial_id:04d}",
+        )
+        vec_env.close()
+        status = "pruned" if callback.pruned else "complete"
+        best_reward = (
+            callback.best_reward if callback.last_reward is not None else None
+        )
+        store.finish_trial(
+            trial_id,
+            status,
+            model.num_timesteps,
+            best_reward,
+            callback.last_reward,
+        )
+        return trial_id, status, best_reward
+    except Exception:
+        store.finish_trial(trial_id, "failed", None, None, None)
+        raise
+    finally:
+        store.close()
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-trials", type=int, default=32)
+    parser.add_argument(
+        "--threads-per-trial",
+        type=int,
+        default=1,
+        help="CPU cores allocated to each trial",
+    )
+    parser.add_argument(
+        "--n-workers",
+        type=int,
+        help="Concurrent trials (default: cores / threads-per-trial)",
+    )
+    parser.add_argument(
+        "--n-envs",
+        type=int,
+        default=8,
+        help="Number of environments per trial",
+    )
+    parser.add_argument(
+        "--timesteps",
+        type=int,
+        default=2_000_000,
+        help="Maximum number of timesteps per trial",
+    )
+    parser.add_argument(
+        "--eval-freq",
+        type=int,
+        default=100_000,
+        help="Timesteps between early-stopping checks",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=100,
+        help="Number of recent episodes averaged for each check",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=300_000,
+        help="Timesteps before a trial can be stopped early",
+    )
+    parser.add_argument(
+        "--min-trials",
+        type=int,
+        default=4,
+        help="Reports needed at a step before the median rule applies",
+    )
+    parser.add_argument(
+        "--patience",
+        type=int,
+        default=5,
+        help="Checks without improvement before a trial is stopped",
+    )
+    parser.add_argument(
+        "--reward-mode",
+        type=str,
+        default="survival",
+        choices=sorted(REWARD_MODES),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out-dir", type=str, default="tmp/sweep")
+    args = parser.parse_args()
+
+    cores = (
+        sorted(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else list(range(os.cpu_count() or 1))
+    )
+    n_workers = args.n_workers or max(1, len(cores) // args.threads_per_trial)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    config = {
+        "out_dir": args.out_dir,
+        "store": os.path.join(args.out_dir, "sweep.db"),
+        "threads": args.threads_per_trial,
+        "n_envs": args.n_envs,
+        "timesteps": args.timesteps,
+        "eval_freq": args.eval_freq,
+        "window": args.window,
+        "warmup": args.warmup,
+        "min_trials": args.min_trials,
+        "patience": args.patience,
+        "reward_mode": args.reward_mode,
+    }
+
+    store = SweepStore(config["store"])
+    rng = random.Random(args.seed)
+    trials = [(trial_id, sample_hyperparams(rng)) for trial_id in range(args.n_trials)]
+    for trial_id, params in trials:
+        store.add_trial(trial_id, params)
+
+    # One core set per worker process; workers pin themselves at startup
+    ctx = multiprocessing.get_context("spawn")
+    core_queue = ctx.Queue()
+    for worker in range(n_workers):
+        start = worker * args.threads_per_trial % len(cores)
+        core_queue.put(
+            {
+                cores[(start + i) % len(cores)]
+                for i in range(args.threads_per_trial)
+            }
+        )
+
+    print(f"Running {args.n_trials} trials on {n_workers} workers")
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(core_queue, args.threads_per_trial),
+    ) as executor:
+        futures = [
+            executor.submit(run_trial, trial_id, params, config)
+            for trial_id, params in trials
+        ]
+        for future in as_completed(futures):
+            try:
+                trial_id, status, best_reward = future.result()
+            except Exception as e:
+                print(f"Trial failed: {e!r}")
+                continue
+            print(f"Trial {trial_id}: {status}, best reward {best_reward}")
+
+    results = store.results()
+    store.close()
+    with open(os.path.join(args.out_dir, "results.json"), "w") as f:
+        json.dump(results, f, indent=4)
+
+    scored = [r for r in results if r["best_reward"] is not None]
+    if scored:
+        best = max(scored, key=lambda r: r["best_reward"])
+        with open(os.path.join(args.out_dir, "best.json"), "w") as f:
+            json.dump(best["params"], f, indent=4)
+        print(f"Best trial {best['id']}: {best['best_reward']:.2f} {best['params']}")
+
+
+if __name__ == "__main__":
+    _main()
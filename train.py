@@ -1,11 +1,65 @@
 import argparse
+import json
 import os
+import subprocess
+import sys
 
-from helicopter_env import HelicopterEnv
-from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import CheckpointCallback
-from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.vec_env import VecMonitor
+from helicopter_reward import REWARD_MODES
+
+
+# PPO hyperparameters used unless overridden with --hyperparams
+PPO_DEFAULTS = {"batch_size": 256}
+
+
+def make_env(
+    n_envs,
+    log_dir,
+    reward_mode="survival",
+    metrics=None,
+    batched=False,
+    course_bank=None,
+):
+    from episode_monitor import BufferedVecMonitor
+    from helicopter_env import HelicopterEnv
+    from mosaic import VecMosaic
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    if batched:
+        from game_batch import GameBatchVecEnv
+
+        vec_env = GameBatchVecEnv(
+            n_envs, reward_mode=reward_mode, course_bank=course_bank
+        )
+    else:
+        # Episodes are recorded once for all envs by the buffered monitor, so
+        # the per-env Monitor wrappers of make_vec_env are not used
+        env_kwargs = {
+            "render_mode": "rgb_array",
+            "reward_mode": reward_mode,
+            "course_bank": course_bank,
+        }
+        vec_env = DummyVecEnv(
+            [lambda: HelicopterEnv(**env_kwargs) for _ in range(n_envs)]
+        )
+    vec_env = BufferedVecMonitor(VecMosaic(vec_env), log_dir)
+    if metrics is not None:
+        from metrics import VecEnvMetrics
+
+        vec_env = VecEnvMetrics(vec_env, metrics)
+    return vec_env
+
+
+def make_model(vec_env, log_dir, verbose=1, **hyperparams):
+    from stable_baselines3 import PPO
+
+    return PPO(
+        "MlpPolicy",
+        vec_env,
+        verbose=verbose,
+        tensorboard_log=os.path.join(log_dir, "tensorboard"),
+        device="cpu",
+        **{**PPO_DEFAULTS, **hyperparams},
+    )
 
 
 def _main():
@@ -28,28 +82,83 @@ def _main():
         default=1000,
         help="Frequency (in steps) to save checkpoints",
     )
+    parser.add_argument(
+        "--reward-mode",
+        type=str,
+        default="survival",
+        choices=sorted(REWARD_MODES),
+        help="Reward shaping mode",
+    )
+    parser.add_argument(
+        "--hyperparams",
+        type=str,
+        help="JSON file with PPO hyperparameters, e.g. the best.json of a sweep",
+    )
+    parser.add_argument(
+        "--background-eval",
+        action="store_true",
+        help="Evaluate new checkpoints in a separate low-priority process",
+    )
+    parser.add_argument(
+        "--batched-envs",
+        action="store_true",
+        help="Simulate all envs as arrays in one GameBatchVecEnv (for many envs)",
+    )
+    parser.add_argument(
+        "--course-bank",
+        type=str,
+        help="Train on the courses of a bank built with course_bank.py",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on localhost at this port",
+    )
+    parser.add_argument(
+        "--mosaic-freq",
+        type=int,
+        default=0,
+        help="Steps between mosaics of all envs logged to TensorBoard (0: off)",
+    )
     args = parser.parse_args()
 
-    vec_env = make_vec_env(
-        HelicopterEnv,
-        n_envs=args.n_envs,
-        env_kwargs={"render_mode": "rgb_array"},
-    )
-    log_dir = "tmp/"
-    os.makedirs(log_dir, exist_ok=True)
-    vec_env = VecMonitor(vec_env, log_dir)
+    from callbacks import RewardTermsCallback
+    from stable_baselines3.common.callbacks import CallbackList, CheckpointCallback
 
-    model = PPO(
-        "MlpPolicy",
-        vec_env,
-        verbose=1,
-        tensorboard_log=os.path.join(log_dir, "tensorboard"),
-        device="cpu",
-        batch_size=256,
+    hyperparams = {}
+    if args.hyperparams:
+        with open(args.hyperparams) as f:
+            hyperparams = json.load(f)
+
+    callbacks = [RewardTermsCallback()]
+    metrics = None
+    if args.metrics_port:
+        from metrics import MetricsCallback, MetricsRegistry, MetricsServer
+
+        metrics = MetricsRegistry()
+        MetricsServer(metrics, port=args.metrics_port)
+        callbacks.append(MetricsCallback(metrics))
+
+    if args.mosaic_freq:
+        from mosaic import MosaicCallback
+
+        callbacks.append(MosaicCallback(args.mosaic_freq))
+
+    log_dir = "tmp/"
+    vec_env = make_env(
+        args.n_envs,
+        log_dir,
+        reward_mode=args.reward_mode,
+        metrics=metrics,
+        batched=args.batched_envs,
+        course_bank=args.course_bank,
     )
+    model = make_model(vec_env, log_dir, **hyperparams)
     tb_log_name = "ppo"
     if args.n_envs > 0:
         tb_log_name += f"_nenv{args.n_envs}"
+    if args.reward_mode != "survival":
+        tb_log_name += f"_{args.reward_mode}"
 
     # Save a checkpoint periodically
     checkpoint_callback = CheckpointCallback(
@@ -60,11 +169,29 @@ def _main():
         save_vecnormalize=True,
     )
 
-    model.learn(
-        total_timesteps=args.total_timesteps,
-        callback=checkpoint_callback,
-        tb_log_name=tb_log_name,
-    )
+    evaluator = None
+    if args.background_eval:
+        script = os.path.join(os.path.dirname(__file__), "checkpoint_evaluator.py")
+        evaluator = subprocess.Popen(
+            [
+                sys.executable,
+                script,
+                "--checkpoint-dir",
+                log_dir,
+                "--reward-mode",
+                args.reward_mode,
+            ]
+        )
+    try:
+        model.learn(
+            total_timesteps=args.total_timesteps,
+            callback=CallbackList([checkpoint_callback, *callbacks]),
+            tb_log_name=tb_log_name,
+        )
+    finally:
+        if evaluator:
+            evaluator.terminate()
+            evaluator.wait()
 
 
 if __name__ == "__main__":